@@ -16,6 +16,21 @@ import tempfile
 import time
 import platform
 import argparse
+import json
+import struct
+import contextlib
+import re
+import sqlite3
+import csv
+import hashlib
+import threading
+import uuid
+try:
+    import fcntl
+except ImportError:  # Windows: the scratch ledger is then unlocked (best effort)
+    fcntl = None
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from datetime import datetime
 
@@ -68,11 +83,1173 @@ def printc(msg, color=None, bold=False):
         out = Colors.BOLD + out + Colors.RESET if Colors.ENABLE else out
     print(out)
 
+# ---------------------------
+# Update settings
+# ---------------------------
+UPDATE_RECHECK_SECONDS = 6 * 3600
+DOWNLOAD_CHUNK = 256 * 1024
+PROGRESS_INTERVAL = 0.2
+
+# ---------------------------
+# Decompile profiles (extra apktool flags)
+# ---------------------------
+DECOMPILE_PROFILES = {
+    'full': [],
+    'no-src': ['-s'],
+    'no-res': ['-r'],
+    'manifest': ['-s', '-r', '--force-manifest'],
+    'dex': ['-s', '-r'],
+}
+DECOMPILE_PROFILE_FILE = ".zero_two_profile.json"
+
+# ---------------------------
+# Zip / bundle helpers
+# ---------------------------
+EOCD_SIG = b"PK\x05\x06"
+LOCAL_HEADER_SIG = b"PK\x03\x04"
+VERIFY_CHUNK = 1024 * 1024
+
+def read_eocd(fp, file_size):
+    # Scan the tail for the end-of-central-directory record (22 bytes + comment)
+    tail = min(file_size, 22 + 0xFFFF)
+    fp.seek(file_size - tail)
+    data = fp.read(tail)
+    idx = data.rfind(EOCD_SIG)
+    if idx < 0 or len(data) - idx < 22:
+        return None
+    (_, disk, cd_disk, n_disk, n_total, cd_size, cd_offset, comment_len) = struct.unpack("<4sHHHHIIH", data[idx:idx + 22])
+    return {
+        'offset': file_size - tail + idx,
+        'entries_disk': n_disk,
+        'entries': n_total,
+        'cd_size': cd_size,
+        'cd_offset': cd_offset,
+        'comment_len': comment_len,
+        'trailing': len(data) - idx - 22,
+    }
+
+def check_zip_structure(zf, fp, file_size):
+    # Central directory / EOCD consistency and local header sanity.
+    # Returns a list of problems (empty when the archive looks sound).
+    errors = []
+    eocd = read_eocd(fp, file_size)
+    if not eocd:
+        return ["end-of-central-directory record not found (truncated?)"]
+    if eocd['trailing'] != eocd['comment_len']:
+        errors.append(f"EOCD comment length {eocd['comment_len']} != {eocd['trailing']} trailing bytes")
+    infos = zf.infolist()
+    zip64 = eocd['entries'] == 0xFFFF or eocd['cd_offset'] == 0xFFFFFFFF or eocd['cd_size'] == 0xFFFFFFFF
+    cd_start = eocd['offset']
+    if not zip64:
+        if eocd['entries'] != len(infos) or eocd['entries_disk'] != eocd['entries']:
+            errors.append(f"EOCD lists {eocd['entries']} entries, central directory has {len(infos)}")
+        concat = eocd['offset'] - eocd['cd_size'] - eocd['cd_offset']
+        if concat < 0:
+            errors.append("central directory extends past EOCD record")
+        cd_start = eocd['offset'] - eocd['cd_size']
+    seen = set()
+    for info in infos:
+        if info.filename in seen:
+            errors.append(f"duplicate entry: {info.filename}")
+        seen.add(info.filename)
+        if info.header_offset + 30 > cd_start:
+            errors.append(f"{info.filename}: local header beyond central directory")
+            continue
+        fp.seek(info.header_offset)
+        hdr = fp.read(30)
+        if len(hdr) < 30 or hdr[:4] != LOCAL_HEADER_SIG:
+            errors.append(f"{info.filename}: bad local header signature")
+            continue
+        name_len, extra_len = struct.unpack("<HH", hdr[26:30])
+        data_end = info.header_offset + 30 + name_len + extra_len + info.compress_size
+        if data_end > cd_start:
+            errors.append(f"{info.filename}: data overlaps central directory (truncated?)")
+    return errors
+
+class FileSlice:
+    """
+    Read-only, seekable window [offset, offset + length) of a file. Lets
+    zipfile open a stored nested APK in place, with cheap random access
+    instead of going through the outer ZipExtFile.
+    """
+    def __init__(self, path, offset, length):
+        self.f = open(path, 'rb')
+        self.offset = offset
+        self.length = length
+        self.pos = 0
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, pos, whence=0):
+        base = {0: 0, 1: self.pos, 2: self.length}[whence]
+        self.pos = max(0, min(self.length, base + pos))
+        return self.pos
+
+    def read(self, n=-1):
+        if n is None or n < 0 or n > self.length - self.pos:
+            n = self.length - self.pos
+        self.f.seek(self.offset + self.pos)
+        data = self.f.read(n)
+        self.pos += len(data)
+        return data
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+def entry_data_offset(fp, info):
+    # Start of an entry's (compressed) data: local header + name + extra
+    fp.seek(info.header_offset)
+    hdr = fp.read(30)
+    name_len, extra_len = struct.unpack("<HH", hdr[26:30])
+    return info.header_offset + 30 + name_len + extra_len
+
+def crc_check_batch(apks_path, tasks, sources):
+    # Worker: one ZipFile handle per thread; nested APKs are opened once per
+    # batch from sources[outer] = (path, offset, length), a stored slice of
+    # the bundle or a scratch copy inflated once. Tasks arrive sorted by
+    # (outer, header_offset) so reads only move forward.
+    # Reading to EOF makes zipfile validate the CRC; zlib releases the GIL.
+    errors = []
+    nested = {}
+    with zipfile.ZipFile(apks_path, 'r') as z:
+        for _, outer, inner, _ in tasks:
+            label = outer if inner is None else f"{outer}!{inner}"
+            try:
+                if inner is None:
+                    src = z.open(outer)
+                else:
+                    if outer not in nested:
+                        for nz in nested.values():
+                            nz.close()
+                        nested = {outer: zipfile.ZipFile(FileSlice(*sources[outer]), 'r')}
+                    src = nested[outer].open(inner)
+                with src:
+                    while src.read(VERIFY_CHUNK):
+                        pass
+            except Exception as e:
+                errors.append(f"{label}: {e}")
+    for nz in nested.values():
+        nz.close()
+    return errors
+
+def bundle_size(path):
+    # Uncompressed size from the central directory (scratch sizing hint)
+    try:
+        with zipfile.ZipFile(path, 'r') as z:
+            return sum(i.file_size for i in z.infolist())
+    except Exception:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+def size_breakdown(path, top=15):
+    # Compressed/uncompressed bytes from central directories only (nested APKs included)
+    report = {'file': os.path.abspath(path), 'file_size': os.path.getsize(path),
+              'compressed': 0, 'uncompressed': 0,
+              'splits': {}, 'top_level': {}, 'dex': {}, 'abi': {}, 'largest': []}
+    entries = []
+    # only bundles hold splits; a .apk inside a plain APK is just an asset
+    bundle = path.lower().endswith(('.apks', '.apkm', '.xapk'))
+
+    def add(bucket, key, info):
+        c, u = bucket.setdefault(key, [0, 0])
+        bucket[key] = [c + info.compress_size, u + info.file_size]
+
+    def walk(zf, prefix):
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            name = info.filename
+            if prefix is None and bundle and name.lower().endswith('.apk'):
+                with zf.open(info) as fp:
+                    try:
+                        nz = zipfile.ZipFile(fp, 'r')
+                    except zipfile.BadZipFile:
+                        nz = None  # not a zip after all: count it as an opaque file
+                    if nz:
+                        add(report['splits'], name, info)
+                        with nz:
+                            walk(nz, name)
+                        continue
+            label = name if prefix is None else f"{prefix}!{name}"
+            report['compressed'] += info.compress_size
+            report['uncompressed'] += info.file_size
+            entries.append((info.compress_size, info.file_size, label))
+            top_key = name.split('/', 1)[0] + ('/' if '/' in name else '')
+            add(report['top_level'], top_key, info)
+            if re.fullmatch(r'classes\d*\.dex', name):
+                add(report['dex'], name if prefix is None else f"{prefix}!{name}", info)
+            if name.startswith('lib/') and name.count('/') >= 2:
+                add(report['abi'], name.split('/')[1], info)
+
+    with zipfile.ZipFile(path, 'r') as z:
+        walk(z, None)
+    for key in ('splits', 'top_level', 'dex', 'abi'):
+        report[key] = [{'name': k, 'compressed': v[0], 'uncompressed': v[1]}
+                       for k, v in sorted(report[key].items(), key=lambda kv: kv[1][0], reverse=True)]
+    entries.sort(reverse=True)
+    report['largest'] = [{'name': n, 'compressed': c, 'uncompressed': u} for c, u, n in entries[:top]]
+    return report
+
+def zip_splice_raw(dst_path, src_path, names):
+    """
+    Appends entries from src_path to dst_path by copying their compressed bytes
+    as-is (no inflate/deflate). Falls back to a regular re-compressing copy if
+    this Python's zipfile internals differ. Returns the names spliced.
+    """
+    done = []
+    with zipfile.ZipFile(src_path, 'r') as zs, open(src_path, 'rb') as fs, zipfile.ZipFile(dst_path, 'a') as zd:
+        present = set(zd.namelist())
+        for name in names:
+            if name in present:
+                continue
+            info = zs.getinfo(name)
+            try:
+                fs.seek(info.header_offset)
+                hdr = fs.read(30)
+                name_len, extra_len = struct.unpack("<HH", hdr[26:30])
+                zi = zipfile.ZipInfo(info.filename, info.date_time)
+                zi.compress_type = info.compress_type
+                zi.CRC, zi.compress_size, zi.file_size = info.CRC, info.compress_size, info.file_size
+                zi.external_attr = info.external_attr
+                zi.flag_bits = info.flag_bits & ~0x08  # sizes go in the local header, no data descriptor
+                zd.fp.seek(zd.start_dir)
+                zi.header_offset = zd.fp.tell()
+                zd.fp.write(zi.FileHeader())
+                fs.seek(info.header_offset + 30 + name_len + extra_len)
+                remaining = info.compress_size
+                while remaining:
+                    chunk = fs.read(min(VERIFY_CHUNK, remaining))
+                    if not chunk:
+                        raise IOError(f"{name}: source truncated")
+                    zd.fp.write(chunk)
+                    remaining -= len(chunk)
+                zd.start_dir = zd.fp.tell()
+                zd.filelist.append(zi)
+                zd.NameToInfo[zi.filename] = zi
+                zd._didModify = True
+            except AttributeError:
+                zd.writestr(info, zs.read(name))
+            done.append(name)
+    return done
+
+def split_balanced(tasks, n):
+    """
+    Partitions verify tasks (size, outer, inner, header_offset) over n workers.
+    Each nested APK's entries are cut into contiguous header_offset ranges of
+    similar size, one per worker, so nobody seeks back through a nested file;
+    top-level entries are then spread greedily by size.
+    """
+    n = max(1, n)
+    buckets = [[0, []] for _ in range(n)]
+    groups = {}
+    top = []
+    for t in tasks:
+        if t[2] is None:
+            top.append(t)
+        else:
+            groups.setdefault(t[1], []).append(t)
+    for entries in groups.values():
+        entries.sort(key=lambda t: t[3])
+        share = sum(t[0] for t in entries) / n
+        i, acc = 0, 0
+        for t in entries:
+            if acc >= share * (i + 1) and i < n - 1:
+                i += 1
+            buckets[i][0] += t[0]
+            buckets[i][1].append(t)
+            acc += t[0]
+    for t in sorted(top, key=lambda t: t[0], reverse=True):
+        b = min(buckets, key=lambda b: b[0])
+        b[0] += t[0]
+        b[1].append(t)
+    return [sorted(b[1], key=lambda t: (t[1], t[2] is not None, t[3])) for b in buckets if b[1]]
+
+# ---------------------------
+# Scratch space (temp dirs with quota + cleanup)
+# ---------------------------
+class ScratchSpace:
+    """
+    Hands out zero_two_<kind>_<host>_<pid>_* work dirs under one root. Prefers
+    tmpfs (/dev/shm) when the job fits comfortably in RAM and always removes
+    the dir on exit. Every job reserves its size hint in a ledger under the
+    scratch root (one <host>_<pid>_* file per job, updated under flock), so
+    quota caps the bytes reserved by all running zero_two processes sharing
+    that root; a job waits until enough reservations are released. Dirs and
+    ledger entries left by crashed runs on this host (dead pid) are swept;
+    other hosts' dirs on a shared root are never touched.
+    """
+    PREFIX = "zero_two_"
+    TMPFS = "/dev/shm"
+    LEDGER = ".zero_two_scratch_ledger"
+    LEGACY_MAX_AGE = 6 * 3600
+    WAIT_POLL = 1.0
+
+    def __init__(self, root=None, quota=None, prefer_tmpfs=True):
+        self.root = os.path.expanduser(root) if root else None
+        self.quota = quota
+        self.prefer_tmpfs = prefer_tmpfs
+        self.host = re.sub(r'[^A-Za-z0-9.-]', '-', platform.node() or 'localhost')
+
+    def free_bytes(self, path):
+        try:
+            st = os.statvfs(path)
+            return st.f_bavail * st.f_frsize
+        except (AttributeError, OSError):
+            return 0
+
+    def mem_available(self):
+        try:
+            with open('/proc/meminfo', 'r') as f:
+                for line in f:
+                    if line.startswith('MemAvailable:'):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError, IndexError):
+            pass
+        return 0
+
+    def pick_root(self, size_hint=0):
+        if self.root:
+            os.makedirs(self.root, exist_ok=True)
+            return self.root
+        if self.prefer_tmpfs and size_hint and os.path.isdir(self.TMPFS) and os.access(self.TMPFS, os.W_OK):
+            # leave headroom: tmpfs pages compete with the JVM / extraction itself
+            if size_hint * 2 < min(self.free_bytes(self.TMPFS), self.mem_available()):
+                return self.TMPFS
+        return tempfile.gettempdir()
+
+    def ledger_dir(self):
+        path = os.path.join(self.root or tempfile.gettempdir(), self.LEDGER)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @contextlib.contextmanager
+    def _ledger_lock(self):
+        with open(os.path.join(self.ledger_dir(), "lock"), 'a') as f:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def _reserved(self):
+        # Bytes reserved by live jobs; drops entries of dead pids on this host
+        # (and other hosts' entries once clearly stale). Caller holds the lock.
+        ledger = self.ledger_dir()
+        total = 0
+        for name in os.listdir(ledger):
+            parts = name.split('_', 2)
+            if len(parts) != 3 or not parts[1].isdigit():
+                continue
+            path = os.path.join(ledger, name)
+            try:
+                if parts[0] == self.host:
+                    stale = not pid_alive(int(parts[1]))
+                else:
+                    stale = time.time() - os.path.getmtime(path) > self.LEGACY_MAX_AGE
+                if stale:
+                    os.remove(path)
+                    continue
+                with open(path, 'r') as f:
+                    total += int(f.read().strip() or 0)
+            except (OSError, ValueError):
+                continue
+        return total
+
+    def _reserve(self, size):
+        waited = False
+        while True:
+            with self._ledger_lock():
+                if self.quota is None or self._reserved() + size <= self.quota:
+                    entry = os.path.join(self.ledger_dir(), f"{self.host}_{os.getpid()}_{uuid.uuid4().hex[:8]}")
+                    with open(entry, 'w') as f:
+                        f.write(str(size))
+                    return entry
+            if not waited:
+                printc(f"    ⏳ Waiting for scratch quota ({size / (1024*1024):.1f} MB needed)...", Colors.YELLOW)
+                waited = True
+            time.sleep(self.WAIT_POLL)
+
+    @contextlib.contextmanager
+    def job(self, kind, size_hint=0):
+        if self.quota is not None and size_hint > self.quota:
+            raise RuntimeError(f"scratch quota exceeded: job needs {size_hint} bytes, quota is {self.quota}")
+        entry = self._reserve(size_hint)
+        path = None
+        try:
+            path = tempfile.mkdtemp(prefix=f"{self.PREFIX}{kind}_{self.host}_{os.getpid()}_", dir=self.pick_root(size_hint))
+            yield path
+        finally:
+            if path:
+                shutil.rmtree(path, ignore_errors=True)
+            try:
+                os.remove(entry)
+            except FileNotFoundError:
+                pass
+
+    def sweep(self):
+        # Remove this host's zero_two_* dirs (and ledger entries) whose owning process is gone
+        try:
+            with self._ledger_lock():
+                self._reserved()
+        except OSError:
+            pass
+        removed = 0
+        roots = {r for r in (self.root, self.TMPFS, tempfile.gettempdir()) if r and os.path.isdir(r)}
+        for root in roots:
+            try:
+                entries = os.listdir(root)
+            except OSError:
+                continue
+            for name in entries:
+                path = os.path.join(root, name)
+                if not name.startswith(self.PREFIX) or not os.path.isdir(path):
+                    continue
+                parts = name[len(self.PREFIX):].split('_', 3)
+                if len(parts) == 4 and parts[2].isdigit() and not parts[1].isdigit():
+                    # zero_two_<kind>_<host>_<pid>_*: only ours, and only when the pid is gone
+                    if parts[1] != self.host or pid_alive(int(parts[2])):
+                        continue
+                else:
+                    # older naming without a host: only sweep when clearly stale
+                    try:
+                        if time.time() - os.path.getmtime(path) < self.LEGACY_MAX_AGE:
+                            continue
+                    except OSError:
+                        continue
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        return removed
+
+def pid_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+# ---------------------------
+# Content-addressed split store (dedup across bundle versions)
+# ---------------------------
+class SplitStore:
+    """
+    Content-addressed store for APKs pulled out of bundles. Entries are looked
+    up by (CRC-32, size) from the central directory and confirmed by SHA-256;
+    outputs are hardlinked from objects/<sha[:2]>/<sha> (copied when the
+    filesystem can't link) and tracked in store.db so gc() can drop objects
+    nothing refers to anymore. Objects are read-only: edit a copy, not a link.
+    """
+    CHUNK = 1024 * 1024
+
+    def __init__(self, root):
+        self.root = os.path.abspath(os.path.expanduser(root))
+        self.objects = os.path.join(self.root, "objects")
+        os.makedirs(self.objects, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(self.root, "store.db"))
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS objects (sha TEXT PRIMARY KEY, crc INTEGER, size INTEGER);
+            CREATE INDEX IF NOT EXISTS idx_objects_crc ON objects(crc, size);
+            CREATE TABLE IF NOT EXISTS refs (path TEXT PRIMARY KEY, sha TEXT, ino INTEGER);
+        """)
+
+    def object_path(self, sha):
+        return os.path.join(self.objects, sha[:2], sha)
+
+    def is_object(self, path):
+        return os.path.dirname(os.path.dirname(os.path.realpath(path))) == os.path.realpath(self.objects)
+
+    def put(self, zf, info):
+        # -> object path for this zip entry, writing it only if the content is new
+        candidates = [r[0] for r in self.db.execute("SELECT sha FROM objects WHERE crc = ? AND size = ?",
+                                                    (info.CRC, info.file_size))]
+        candidates = [c for c in candidates if os.path.exists(self.object_path(c))]
+        if candidates:
+            h = hashlib.sha256()
+            with zf.open(info) as src:
+                for chunk in iter(lambda: src.read(self.CHUNK), b""):
+                    h.update(chunk)
+            if h.hexdigest() in candidates:
+                return self.object_path(h.hexdigest())
+        fd, tmp = tempfile.mkstemp(prefix=".incoming_", dir=self.root)
+        h = hashlib.sha256()
+        try:
+            with os.fdopen(fd, 'wb') as dst, zf.open(info) as src:
+                for chunk in iter(lambda: src.read(self.CHUNK), b""):
+                    h.update(chunk)
+                    dst.write(chunk)
+            sha = h.hexdigest()
+            obj = self.object_path(sha)
+            os.makedirs(os.path.dirname(obj), exist_ok=True)
+            if os.path.exists(obj):
+                os.remove(tmp)
+            else:
+                os.chmod(tmp, 0o444)
+                os.replace(tmp, obj)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO objects (sha, crc, size) VALUES (?, ?, ?)",
+                            (sha, info.CRC, info.file_size))
+        return obj
+
+    def checkout(self, obj, dest):
+        # Hardlink an object to dest (atomic replace) and record the reference.
+        # A fallback copy shares no storage with the object, so it gets no ref.
+        dest = os.path.abspath(dest)
+        part = dest + ".part"
+        remove_output(part)
+        try:
+            os.link(obj, part)
+            linked = True
+        except OSError:
+            shutil.copy2(obj, part)
+            os.chmod(part, 0o644)
+            linked = False
+        os.replace(part, dest)
+        with self.db:
+            if linked:
+                self.db.execute("INSERT OR REPLACE INTO refs (path, sha, ino) VALUES (?, ?, ?)",
+                                (dest, os.path.basename(obj), os.stat(dest).st_ino))
+            else:
+                self.db.execute("DELETE FROM refs WHERE path = ?", (dest,))
+        return dest
+
+    def gc(self):
+        # Drop refs whose file is gone or no longer the same inode, then objects with no refs
+        dropped = 0
+        with self.db:
+            for path, sha, ino in self.db.execute("SELECT path, sha, ino FROM refs").fetchall():
+                try:
+                    alive = os.stat(path).st_ino == ino
+                except OSError:
+                    alive = False
+                if not alive:
+                    self.db.execute("DELETE FROM refs WHERE path = ?", (path,))
+                    dropped += 1
+            live = {r[0] for r in self.db.execute("SELECT DISTINCT sha FROM refs")}
+            removed, freed = 0, 0
+            for (sha,) in self.db.execute("SELECT sha FROM objects").fetchall():
+                if sha in live:
+                    continue
+                obj = self.object_path(sha)
+                try:
+                    freed += os.path.getsize(obj)
+                    os.remove(obj)
+                except OSError:
+                    pass
+                self.db.execute("DELETE FROM objects WHERE sha = ?", (sha,))
+                removed += 1
+        return dropped, removed, freed
+
+    def stats(self):
+        objs, size = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects").fetchone()
+        refs, logical = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(o.size), 0) FROM refs r JOIN objects o ON o.sha = r.sha").fetchone()
+        return {'objects': objs, 'bytes': size, 'refs': refs, 'logical_bytes': logical}
+
+# ---------------------------
+# Batch checkpoint journal
+# ---------------------------
+def remove_output(path):
+    # Drop a (possibly half-written) file or directory output
+    for p in (path, path + ".part"):
+        if os.path.isdir(p):
+            shutil.rmtree(p, ignore_errors=True)
+        elif os.path.exists(p):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+class BatchJournal:
+    """
+    Append-only JSON-lines journal of batch items (pending/running/done/failed).
+    Every record is fsync'd, so the last consistent state survives OOM kills,
+    device sleep or Ctrl-C; a torn final line is ignored on replay.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.items = {}
+
+    def load(self):
+        self.items = {}
+        if not os.path.exists(self.path):
+            return self
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                item = self.items.setdefault(rec['key'], {'attempts': 0})
+                item['state'] = rec['state']
+                item['output'] = rec.get('output')
+                item['error'] = rec.get('error')
+                if rec['state'] == 'running':
+                    item['attempts'] += 1
+        return self
+
+    def reset(self):
+        self.items = {}
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.flush()
+            os.fsync(f.fileno())
+
+    def record(self, key, state, output=None, error=None):
+        rec = {'ts': now_ts(), 'key': key, 'state': state, 'output': output}
+        if error:
+            rec['error'] = error
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(rec) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        item = self.items.setdefault(key, {'attempts': 0})
+        item.update(state=state, output=output, error=error)
+        if state == 'running':
+            item['attempts'] += 1
+
+    def unfinished(self):
+        return [k for k, v in self.items.items() if v.get('state') != 'done']
+
+    def plan(self, outputs, resume=False, max_retries=3):
+        """
+        outputs: ordered {key: output_path}. Returns the keys that still need
+        to run; on resume, cleans up outputs of items interrupted mid-write.
+        """
+        if not resume:
+            self.reset()
+            for key, out in outputs.items():
+                self.record(key, 'pending', out)
+            return list(outputs)
+
+        self.load()
+        todo = []
+        for key, out in outputs.items():
+            item = self.items.get(key)
+            if item is None:
+                self.record(key, 'pending', out)
+                todo.append(key)
+                continue
+            state = item.get('state')
+            if state == 'done' and item.get('output') and os.path.exists(item['output']):
+                continue
+            if state == 'failed' and item['attempts'] >= max_retries:
+                printc(f"    ⚠️ Giving up on {key} after {item['attempts']} attempt(s): {item.get('error')}", Colors.YELLOW)
+                continue
+            if state == 'running':
+                remove_output(item.get('output') or out)
+            todo.append(key)
+        return todo
+
+    def close_if_complete(self):
+        if not self.unfinished():
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+# ---------------------------
+# Multi-node work sharing (lease files)
+# ---------------------------
+class LeaseDir:
+    """
+    Cooperative claiming of files in a shared (e.g. NFS) directory.
+    A claim is an O_EXCL-created <name>.lease; holders refresh its mtime from a
+    heartbeat thread, and a lease whose mtime is older than ttl is reclaimed by
+    renaming it aside (atomic, so only one node wins). Finished items get a
+    <name>.done marker so no node picks them up again. Each lease carries a
+    random token; a holder only refreshes or removes a lease whose token is
+    its own, and one that finds someone else's lease has lost the item.
+    """
+    def __init__(self, directory, node_id, ttl=120, heartbeat=None):
+        self.root = os.path.join(directory, ".zero_two_leases")
+        os.makedirs(self.root, exist_ok=True)
+        self.node_id = node_id
+        self.ttl = ttl
+        self.heartbeat = heartbeat or max(1, ttl // 4)
+        self.held = {}
+        self.lost = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _path(self, name, suffix):
+        return os.path.join(self.root, f"{name}.{suffix}")
+
+    def is_finished(self, name):
+        return os.path.exists(self._path(name, 'done'))
+
+    def failures(self, name):
+        try:
+            with open(self._path(name, 'failed'), 'r', encoding='utf-8') as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _create(self, path, token):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'node': self.node_id, 'pid': os.getpid(), 'token': token, 'ts': now_ts()}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        return True
+
+    def _touch(self, name, token):
+        # Refresh the lease through the fd we checked, so a lease another node
+        # put at the same path after a reclaim is never kept alive by us.
+        try:
+            with open(self._path(name, 'lease'), 'r', encoding='utf-8') as f:
+                if json.load(f).get('token') != token:
+                    return False
+                os.utime(f.fileno())
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def _drop(self, name, token):
+        # Remove our lease only: move it aside, and put it back if it isn't ours
+        path = self._path(name, 'lease')
+        aside = f"{path}.drop.{uuid.uuid4().hex[:8]}"
+        try:
+            os.rename(path, aside)
+        except FileNotFoundError:
+            return
+        try:
+            with open(aside, 'r', encoding='utf-8') as f:
+                mine = json.load(f).get('token') == token
+        except (OSError, ValueError):
+            mine = False
+        if not mine:
+            try:
+                os.link(aside, path)
+            except OSError:
+                pass
+        os.remove(aside)
+
+    def _reclaim(self, path):
+        # Move an expired lease aside; re-check the inode so we never steal a
+        # lease another node created after our stat.
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return True
+        if time.time() - st.st_mtime < self.ttl:
+            return False
+        aside = f"{path}.stale.{uuid.uuid4().hex[:8]}"
+        try:
+            os.rename(path, aside)
+        except FileNotFoundError:
+            return True
+        if os.stat(aside).st_ino != st.st_ino:
+            try:
+                os.link(aside, path)
+            except OSError:
+                pass
+            os.remove(aside)
+            return False
+        try:
+            with open(aside, 'r', encoding='utf-8') as f:
+                printc(f"    ♻️ Reclaimed expired lease from {json.load(f).get('node')}", Colors.YELLOW)
+        except (OSError, ValueError):
+            pass
+        os.remove(aside)
+        return True
+
+    def claim(self, name):
+        if self.is_finished(name):
+            return False
+        path = self._path(name, 'lease')
+        token = uuid.uuid4().hex
+        if not self._create(path, token):
+            if not self._reclaim(path) or not self._create(path, token):
+                return False
+        # done marker may have landed between the check and the create
+        if self.is_finished(name):
+            self._drop(name, token)
+            return False
+        with self._lock:
+            self.held[name] = token
+        return True
+
+    def release(self, name, ok, output=None):
+        # -> False if the lease was lost meanwhile; the new holder owns the
+        # outcome then, so nothing is recorded here.
+        with self._lock:
+            token = self.held.pop(name, None)
+            lost = name in self.lost
+            self.lost.discard(name)
+        if token is None or lost or not self._touch(name, token):
+            printc(f"    ⚠️ Lease on {name} was lost; leaving the result to its new holder", Colors.YELLOW)
+            return False
+        if ok:
+            tmp = self._path(name, f"done.{self.node_id}.tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'node': self.node_id, 'output': output, 'ts': now_ts()}, f)
+            os.replace(tmp, self._path(name, 'done'))
+        else:
+            tmp = self._path(name, f"failed.{self.node_id}.tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(str(self.failures(name) + 1))
+            os.replace(tmp, self._path(name, 'failed'))
+        self._drop(name, token)
+        return True
+
+    def _beat(self):
+        while not self._stop.wait(self.heartbeat):
+            with self._lock:
+                held = [(n, t) for n, t in self.held.items() if n not in self.lost]
+            for name, token in held:
+                if not self._touch(name, token):
+                    with self._lock:
+                        self.lost.add(name)
+                    printc(f"    ⚠️ Lease on {name} was lost (expired?)", Colors.YELLOW)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._beat, name="zero_two_heartbeat", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        with self._lock:
+            held = list(self.held.items())
+        # crashed mid-item: drop our leases so others don't wait for expiry
+        for name, token in held:
+            self._drop(name, token)
+        return False
+
+    def write_stats(self, stats):
+        tmp = os.path.join(self.root, f"node-{self.node_id}.stats.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(stats, f)
+        os.replace(tmp, os.path.join(self.root, f"node-{self.node_id}.stats.json"))
+
+    @staticmethod
+    def read_stats(root):
+        out = []
+        for f in sorted(os.listdir(root)):
+            if f.startswith('node-') and f.endswith('.stats.json'):
+                try:
+                    with open(os.path.join(root, f), 'r', encoding='utf-8') as fh:
+                        out.append(json.load(fh))
+                except (OSError, ValueError):
+                    pass
+        return out
+
+# ---------------------------
+# Binary AndroidManifest.xml (AXML) reader
+# ---------------------------
+AXML_STRING_POOL = 0x0001
+AXML_RESOURCE_MAP = 0x0180
+AXML_START_ELEMENT = 0x0102
+AXML_NO_INDEX = 0xFFFFFFFF
+# framework attribute IDs, used when attribute names are stripped/obfuscated
+AXML_ATTR_IDS = {
+    0x01010003: 'name', 0x0101021b: 'versionCode', 0x0101021c: 'versionName',
+    0x0101020c: 'minSdkVersion', 0x01010270: 'targetSdkVersion', 0x01010271: 'maxSdkVersion',
+}
+
+def axml_strings(data, off):
+    _, hsize, _, count, _, flags, strings_start, _ = struct.unpack_from("<HHIIIIII", data, off)
+    utf8 = bool(flags & 0x100)
+    offsets = struct.unpack_from(f"<{count}I", data, off + hsize)
+    base = off + strings_start
+    out = []
+    for o in offsets:
+        p = base + o
+        if utf8:
+            # char length, then byte length; each 1 or 2 bytes
+            p += 2 if data[p] & 0x80 else 1
+            n = data[p]
+            if n & 0x80:
+                n = ((n & 0x7F) << 8) | data[p + 1]
+                p += 2
+            else:
+                p += 1
+            out.append(data[p:p + n].decode('utf-8', errors='replace'))
+        else:
+            n = struct.unpack_from("<H", data, p)[0]
+            p += 2
+            if n & 0x8000:
+                n = ((n & 0x7FFF) << 16) | struct.unpack_from("<H", data, p)[0]
+                p += 2
+            out.append(data[p:p + n * 2].decode('utf-16-le', errors='replace'))
+    return out
+
+def axml_elements(data):
+    # Yields (tag, {attr: value}) for every start element
+    strings, resmap = [], []
+    off = struct.unpack_from("<H", data, 2)[0]
+    while off + 8 <= len(data):
+        ctype, hsize, csize = struct.unpack_from("<HHI", data, off)
+        if csize < 8:
+            break
+        if ctype == AXML_STRING_POOL:
+            strings = axml_strings(data, off)
+        elif ctype == AXML_RESOURCE_MAP:
+            resmap = struct.unpack_from(f"<{(csize - hsize) // 4}I", data, off + hsize)
+        elif ctype == AXML_START_ELEMENT:
+            ext = off + hsize
+            _, name, attr_start, attr_size, attr_count = struct.unpack_from("<IIHHH", data, ext)
+            attrs = {}
+            for i in range(attr_count):
+                a = ext + attr_start + i * attr_size
+                _, aname, raw, _, _, dtype, adata = struct.unpack_from("<IIIHBBI", data, a)
+                key = strings[aname] if aname < len(strings) else ""
+                if aname < len(resmap) and resmap[aname] in AXML_ATTR_IDS:
+                    key = AXML_ATTR_IDS[resmap[aname]]
+                if raw != AXML_NO_INDEX and raw < len(strings):
+                    val = strings[raw]
+                elif dtype == 0x03 and adata < len(strings):
+                    val = strings[adata]
+                elif dtype == 0x12:
+                    val = adata != 0
+                elif dtype in (0x10, 0x11):
+                    val = adata - (1 << 32) if adata & 0x80000000 else adata
+                else:
+                    val = f"@0x{adata:08x}"
+                attrs[key] = val
+            yield (strings[name] if name < len(strings) else ""), attrs
+        off += csize
+
+# ---------------------------
+# APK inventory (manifest + central directory only)
+# ---------------------------
+INVENTORY_FIELDS = ['path', 'package', 'version_code', 'version_name', 'min_sdk', 'target_sdk',
+                    'permissions', 'abis', 'dex_count', 'size', 'error']
+
+def inventory_zip(z):
+    names = z.namelist()
+    row = {}
+    for tag, attrs in axml_elements(z.read('AndroidManifest.xml')):
+        if tag == 'manifest':
+            row['package'] = attrs.get('package', '')
+            row['version_code'] = attrs.get('versionCode', '')
+            row['version_name'] = attrs.get('versionName', '')
+        elif tag == 'uses-sdk':
+            row['min_sdk'] = attrs.get('minSdkVersion', '')
+            row['target_sdk'] = attrs.get('targetSdkVersion', '')
+        elif tag.startswith('uses-permission') and attrs.get('name'):
+            row.setdefault('perms', []).append(str(attrs['name']))
+    row['permissions'] = ';'.join(sorted(set(row.pop('perms', []))))
+    row['abis'] = ';'.join(sorted({n.split('/')[1] for n in names if n.startswith('lib/') and n.count('/') >= 2}))
+    row['dex_count'] = sum(1 for n in names if re.fullmatch(r'classes\d*\.dex', n))
+    return row
+
+def inventory_apk(path):
+    # Process-pool worker; .apks bundles are inventoried through their base APK
+    row = dict.fromkeys(INVENTORY_FIELDS, '')
+    row['path'] = path
+    try:
+        row['size'] = os.path.getsize(path)
+        with zipfile.ZipFile(path, 'r') as z:
+            if path.lower().endswith('.apks'):
+                apks = [n for n in z.namelist() if n.lower().endswith('.apk')]
+                base = next((n for n in apks if os.path.basename(n).lower() in ('base.apk', 'base-master.apk', 'master.apk')), None)
+                base = base or max(apks, key=lambda n: z.getinfo(n).file_size)
+                with z.open(base) as fp, zipfile.ZipFile(fp, 'r') as bz:
+                    row.update(inventory_zip(bz))
+                splits = {os.path.basename(n) for n in apks}
+                abis = {a for a in ('arm64_v8a', 'armeabi_v7a', 'armeabi', 'x86_64', 'x86') if any(f"config.{a}" in n for n in splits)}
+                if abis and not row['abis']:
+                    row['abis'] = ';'.join(sorted(a.replace('_v', '-v') for a in abis))
+            else:
+                row.update(inventory_zip(z))
+    except Exception as e:
+        row['error'] = str(e) or type(e).__name__
+    return row
+
+# ---------------------------
+# Smali inverted index (sqlite)
+# ---------------------------
+RESID_RE = re.compile(r"0x7f[0-9a-fA-F]{6}")
+PUBLIC_RE = re.compile(r'<public\s+type="([^"]+)"\s+name="([^"]+)"\s+id="(0x[0-9a-fA-F]+)"')
+
+def smali_to_dotted(desc):
+    if desc.startswith('L') and desc.endswith(';'):
+        desc = desc[1:-1]
+    return desc.replace('/', '.')
+
+def parse_smali_file(path):
+    # -> [(kind, key, term, line)] ; keys are lowercased for case-insensitive prefix lookups
+    rows = []
+    cls = ""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            for n, raw in enumerate(f, 1):
+                line = raw.strip()
+                if not line or line[0] not in '.c':
+                    continue
+                if line.startswith('.class '):
+                    cls = smali_to_dotted(line.split()[-1])
+                    rows.append(('class', cls.lower(), cls, n))
+                    simple = cls.rsplit('.', 1)[-1]
+                    rows.append(('class', simple.lower(), cls, n))
+                elif line.startswith('.method '):
+                    sig = line.split()[-1]
+                    term = f"{cls}->{sig}"
+                    rows.append(('method', sig.lower(), term, n))
+                    rows.append(('method', term.lower(), term, n))
+                elif line.startswith('.field '):
+                    decl = line.split(' = ', 1)[0].split()[-1]
+                    term = f"{cls}->{decl}"
+                    rows.append(('field', decl.lower(), term, n))
+                    rows.append(('field', term.lower(), term, n))
+                elif line.startswith('const-string'):
+                    q = line.find('"')
+                    if q >= 0:
+                        lit = line[q + 1:line.rfind('"')]
+                        rows.append(('string', lit.lower(), lit, n))
+                elif line.startswith('const'):
+                    m = RESID_RE.search(line)
+                    if m:
+                        rid = m.group(0).lower()
+                        rows.append(('resid', rid, rid, n))
+    except OSError:
+        pass
+    return rows
+
+def parse_public_xml(path):
+    rows = []
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            for n, line in enumerate(f, 1):
+                m = PUBLIC_RE.search(line)
+                if m:
+                    rtype, name, rid = m.groups()
+                    term = f"{rtype}/{name} = {rid.lower()}"
+                    rows.append(('resid', rid.lower(), term, n))
+                    rows.append(('resid', f"{rtype}/{name}".lower(), term, n))
+    except OSError:
+        pass
+    return rows
+
+def parse_index_file(path):
+    if path.endswith('.smali'):
+        return path, parse_smali_file(path)
+    return path, parse_public_xml(path)
+
+class SmaliIndex:
+    """
+    Persistent inverted index of a decompiled tree: classes, methods, fields,
+    const-string literals and resource IDs. Stored next to the tree as
+    <dir>.index.db; updates only re-parse files whose mtime/size changed.
+    """
+    KINDS = ('class', 'method', 'field', 'string', 'resid')
+
+    def __init__(self, tree):
+        self.tree = os.path.abspath(os.path.expanduser(tree)).rstrip(os.sep)
+        self.path = self.tree + ".index.db"
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, path TEXT UNIQUE, mtime REAL, size INTEGER);
+            CREATE TABLE IF NOT EXISTS symbols (file_id INTEGER, kind TEXT, key TEXT, term TEXT, line INTEGER);
+            CREATE INDEX IF NOT EXISTS idx_symbols_key ON symbols(key);
+            CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols(file_id);
+        """)
+
+    def close(self):
+        self.db.close()
+
+    def scan(self):
+        found = {}
+        for root, _, files in os.walk(self.tree):
+            for f in files:
+                if f.endswith('.smali') or (f == 'public.xml' and root.endswith(os.path.join('res', 'values'))):
+                    fp = os.path.join(root, f)
+                    try:
+                        st = os.stat(fp)
+                    except OSError:
+                        continue
+                    found[os.path.relpath(fp, self.tree)] = (st.st_mtime, st.st_size)
+        return found
+
+    def update(self, workers=None):
+        # -> (added_or_changed, removed, total)
+        found = self.scan()
+        known = {p: (fid, m, sz) for fid, p, m, sz in self.db.execute("SELECT id, path, mtime, size FROM files")}
+        stale = [p for p in known if p not in found or known[p][1:] != found[p]]
+        todo = [p for p in found if p not in known or known[p][1:] != found[p]]
+        with self.db:
+            for p in stale:
+                fid = known[p][0]
+                self.db.execute("DELETE FROM symbols WHERE file_id = ?", (fid,))
+                self.db.execute("DELETE FROM files WHERE id = ?", (fid,))
+        if todo:
+            paths = [os.path.join(self.tree, p) for p in todo]
+            parsed = False
+            if len(paths) > 200:
+                try:
+                    with ProcessPoolExecutor(max_workers=workers) as pool:
+                        self._store(pool.map(parse_index_file, paths, chunksize=256), found)
+                    parsed = True
+                except (OSError, ImportError, NotImplementedError, BrokenProcessPool):
+                    # no working multiprocessing (some Android builds) or a worker died: the
+                    # partial _store transaction rolled back, so parse everything inline
+                    pass
+            if not parsed:
+                self._store(map(parse_index_file, paths), found)
+        removed = len([p for p in stale if p not in found])
+        return len(todo), removed, len(found)
+
+    def _store(self, results, found):
+        with self.db:
+            for path, rows in results:
+                rel = os.path.relpath(path, self.tree)
+                mtime, size = found[rel]
+                cur = self.db.execute("INSERT INTO files (path, mtime, size) VALUES (?, ?, ?)", (rel, mtime, size))
+                fid = cur.lastrowid
+                self.db.executemany("INSERT INTO symbols (file_id, kind, key, term, line) VALUES (?, ?, ?, ?, ?)",
+                                    [(fid, k, key, term, n) for k, key, term, n in rows])
+
+    def search(self, query, kind=None, limit=50):
+        q = query.strip()
+        # only real descriptors (Lpkg/Cls;) - "Loading; please" is a plain string
+        m = re.match(r'L[\w$]+(?:/[\w$]+)+;', q)
+        if m:
+            q = smali_to_dotted(m.group(0)) + q[m.end():]
+        q = q.lower()
+        if '*' in q:
+            # wildcard: LIKE scan (slower, but still in-db)
+            like = q.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_').replace('*', '%')
+            where, params = "s.key LIKE ? ESCAPE '\\'", [like]
+        else:
+            where, params = "s.key >= ? AND s.key < ?", [q, q + '\uffff']
+        if kind:
+            where += " AND s.kind = ?"
+            params.append(kind)
+        sql = ("SELECT DISTINCT s.kind, s.term, f.path, s.line FROM symbols s JOIN files f ON f.id = s.file_id "
+               f"WHERE {where} ORDER BY length(s.key), s.term LIMIT ?")
+        return self.db.execute(sql, params + [limit]).fetchall()
+
 # ---------------------------
 # Main toolkit class
 # ---------------------------
 class ZeroTwo:
-    def __init__(self, headless=False):
+    def __init__(self, headless=False, scratch_root=None, scratch_quota=None, store_root=None):
         self.name = "ZERO TWO"
         self.version = "3.0.0"
         self.developer = "Ghost Developer"
@@ -81,12 +1258,21 @@ class ZeroTwo:
         self.logs_dir = os.path.join(os.getcwd(), "logs")
         os.makedirs(self.logs_dir, exist_ok=True)
         self.log_file = os.path.join(self.logs_dir, "conversion_log.txt")
+        self.cache_dir = os.path.join(os.getcwd(), "cache")
         self.termux = True if "termux" in os.environ.get('PREFIX', '') else False
         self.apktool_version = self.get_apktool_version()
         self.aapt_available = bool(shutil.which('aapt') or shutil.which('aapt2'))
         self.apksigner_available = bool(shutil.which('apksigner'))
         self.headless = headless
-        self.github_api_release = "https://api.github.com/repos/CHICO-CP/zero-two-toolkit/releases/latest"
+        self.github_api_release = os.environ.get('ZERO_TWO_RELEASE_URL', "https://api.github.com/repos/CHICO-CP/zero-two-toolkit/releases/latest")
+        self.update_cache_file = os.path.join(self.cache_dir, "update_release.json")
+        self.script_path = os.path.abspath(sys.argv[0])
+        self.update_notice = None
+        self.scratch = ScratchSpace(scratch_root or os.environ.get('ZERO_TWO_SCRATCH'), scratch_quota)
+        self.store = SplitStore(store_root) if store_root else None
+        swept = self.scratch.sweep()
+        if swept:
+            self.save_log("scratch_sweep", "OK", f"removed {swept} orphaned dir(s)")
         self.build_banner()
 
     # ---------------------------
@@ -130,6 +1316,8 @@ class ZeroTwo:
 {Colors.colorize('╚' + '═'*60 + '╝', Colors.CYAN)}
 """
         print(menu)
+        if self.update_notice:
+            printc(f"    🚀 Update available: {self.update_notice} (option 7)", Colors.MAGENTA)
         print(f"    apktool: {Colors.colorize(self.apktool_version, Colors.GREEN if self.apktool_version!='Not installed' else Colors.RED)}    aapt: {Colors.colorize('OK' if self.aapt_available else 'MISSING', Colors.GREEN if self.aapt_available else Colors.RED)}")
         print()
 
@@ -163,18 +1351,41 @@ class ZeroTwo:
     # ---------------------------
     # Core: .apks -> .apk
     # ---------------------------
-    def list_apks_inside(self, apks_path):
+    def list_apks_inside(self, apks_path, temp_dir):
+        # Extracts into temp_dir, a self.scratch.job() dir owned by the caller
         action = f"list_apks_inside {apks_path}"
         if not os.path.exists(apks_path):
             printc(f"    ❌ Error: {apks_path} not found.", Colors.RED)
             self.save_log(action, "FAIL", "file not found")
             return []
 
-        temp_dir = tempfile.mkdtemp(prefix="zero_two_extract_")
         try:
             with zipfile.ZipFile(apks_path, 'r') as z:
                 printc("    ⏳ Extracting .apks (this may take a few seconds)...", Colors.YELLOW)
-                z.extractall(temp_dir)
+                if self.store:
+                    # APKs go through the dedup store; scratch only holds symlinks to objects
+                    for info in z.infolist():
+                        if info.is_dir():
+                            continue
+                        if info.filename.lower().endswith('.apk'):
+                            # Same name cleanup zipfile.extract does: no drive, no '..', stay in temp_dir
+                            parts = [x for x in os.path.splitdrive(info.filename.replace('\\', '/'))[1].split('/')
+                                     if x not in ('', '.', '..')]
+                            dest = os.path.join(temp_dir, *parts) if parts else ""
+                            root = os.path.realpath(temp_dir) + os.sep
+                            if not dest or not (os.path.realpath(os.path.dirname(dest)) + os.sep).startswith(root):
+                                printc(f"    ⚠️  Skipping unsafe entry: {info.filename}", Colors.YELLOW)
+                                continue
+                            os.makedirs(os.path.dirname(dest), exist_ok=True)
+                            obj = self.store.put(z, info)
+                            # Duplicate names: the last entry wins, as with extractall
+                            if os.path.lexists(dest):
+                                os.remove(dest)
+                            os.symlink(obj, dest)
+                        else:
+                            z.extract(info, temp_dir)
+                else:
+                    z.extractall(temp_dir)
 
             apk_files = []
             for root, _, files in os.walk(temp_dir):
@@ -186,7 +1397,6 @@ class ZeroTwo:
         except Exception as e:
             printc(f"    ❌ Error extracting: {e}", Colors.RED)
             self.save_log(action, "FAIL", str(e))
-            shutil.rmtree(temp_dir, ignore_errors=True)
             return []
 
     def find_main_apk(self, apk_files):
@@ -208,12 +1418,23 @@ class ZeroTwo:
             return max(apk_files, key=lambda x: os.path.getsize(x))
         return None
 
-    def convert_apks_to_apk(self, apks_path, output_dir=None):
+    def place_output(self, src, dest):
+        # Store-backed files are hardlinked from the store; anything else is copied
+        if self.store and os.path.islink(src) and self.store.is_object(src):
+            return self.store.checkout(os.path.realpath(src), dest)
+        shutil.copy2(src, dest + ".part")
+        os.replace(dest + ".part", dest)
+        return dest
+
+    def convert_apks_to_apk(self, apks_path, output_dir=None, verify=False, keep_splits=False):
         action = f"convert_apks_to_apk {apks_path}"
         if not os.path.exists(apks_path):
             printc(f"    ❌ Error: {apks_path} not found.", Colors.RED)
             self.save_log(action, "FAIL", "not found")
             return False
+        if verify and not self.verify_apks(apks_path):
+            self.save_log(action, "FAIL", "integrity check failed")
+            return False
 
         apks_path = os.path.expanduser(apks_path)
         base_name = os.path.splitext(os.path.basename(apks_path))[0]
@@ -223,50 +1444,296 @@ class ZeroTwo:
         out_apk = os.path.join(output_dir, f"{base_name}.apk")
 
         try:
-            apk_files = self.list_apks_inside(apks_path)
-            if not apk_files:
-                printc("    ❌ No .apk files found in bundle.", Colors.RED)
-                self.save_log(action, "FAIL", "no apk in bundle")
-                return False
+            with self.scratch.job("extract", bundle_size(apks_path)) as temp_dir:
+                apk_files = self.list_apks_inside(apks_path, temp_dir)
+                if not apk_files:
+                    printc("    ❌ No .apk files found in bundle.", Colors.RED)
+                    self.save_log(action, "FAIL", "no apk in bundle")
+                    return False
 
-            printc(f"    📦 Found {len(apk_files)} APK(s) inside bundle.", Colors.CYAN)
-            main = self.find_main_apk(apk_files)
-            if main:
-                shutil.copy2(main, out_apk)
-                size_mb = os.path.getsize(out_apk) / (1024*1024)
-                printc(f"    ✅ Main APK extracted: {out_apk} ({size_mb:.2f} MB)", Colors.GREEN)
-                self.save_log(action, "OK", out_apk)
-                return True
-            else:
-                printc("    ❌ Could not determine main APK.", Colors.RED)
-                self.save_log(action, "FAIL", "no main apk")
-                return False
+                printc(f"    📦 Found {len(apk_files)} APK(s) inside bundle.", Colors.CYAN)
+                main = self.find_main_apk(apk_files)
+                if main:
+                    self.place_output(main, out_apk)
+                    if keep_splits:
+                        splits_dir = os.path.join(output_dir, f"{base_name}_splits")
+                        os.makedirs(splits_dir, exist_ok=True)
+                        for p in apk_files:
+                            self.place_output(p, os.path.join(splits_dir, os.path.basename(p)))
+                        printc(f"    🧩 {len(apk_files)} APK(s) kept in {splits_dir}", Colors.CYAN)
+                    size_mb = os.path.getsize(out_apk) / (1024*1024)
+                    printc(f"    ✅ Main APK extracted: {out_apk} ({size_mb:.2f} MB)", Colors.GREEN)
+                    self.save_log(action, "OK", out_apk)
+                    return True
+                else:
+                    printc("    ❌ Could not determine main APK.", Colors.RED)
+                    self.save_log(action, "FAIL", "no main apk")
+                    return False
         except Exception as e:
             printc(f"    ❌ Error: {e}", Colors.RED)
             self.save_log(action, "FAIL", str(e))
             return False
 
-    def process_directory_apks(self, directory):
+    def process_directory_apks(self, directory, verify=True, resume=False, max_retries=3, keep_splits=False):
         action = f"process_directory_apks {directory}"
         directory = os.path.expanduser(directory)
         if not os.path.isdir(directory):
             printc(f"    ❌ Directory not found: {directory}", Colors.RED)
             self.save_log(action, "FAIL", "dir missing")
             return
-        files = [f for f in os.listdir(directory) if f.lower().endswith('.apks')]
+        files = sorted(f for f in os.listdir(directory) if f.lower().endswith('.apks'))
         if not files:
             printc("    ℹ️ No .apks files found.", Colors.YELLOW)
             self.save_log(action, "OK", "none")
             return
 
         printc(f"    📊 Found {len(files)} .apks files.", Colors.CYAN)
+        journal = BatchJournal(os.path.join(directory, ".zero_two_convert.journal"))
+        outputs = {f: self.apk_output_path(os.path.join(directory, f), directory) for f in files}
+        todo = journal.plan(outputs, resume=resume, max_retries=max_retries)
+        if resume:
+            printc(f"    ♻️ Resuming: {len(files) - len(todo)} already done, {len(todo)} to process.", Colors.CYAN)
+        jobs = [(f, outputs[f], lambda f=f: self.convert_apks_to_apk(os.path.join(directory, f), directory, keep_splits=keep_splits)) for f in todo]
+        if verify and jobs:
+            good = set(self.verify_batch(directory, todo))
+            for f in todo:
+                if f not in good:
+                    journal.record(f, 'running', outputs[f])
+                    journal.record(f, 'failed', outputs[f], "integrity check failed")
+            jobs = [j for j in jobs if j[0] in good]
+        success = self.run_journaled(journal, jobs)
+        printc(f"\n    📈 SUMMARY: {success}/{len(jobs)} succeeded.", Colors.GREEN)
+        self.save_log(action, "OK", f"{success}/{len(jobs)}")
+
+    def process_directory_shared(self, directory, node_id=None, ttl=120, max_retries=3, verify=True):
+        """
+        Cooperative batch mode: several nodes sharing one directory each claim
+        bundles through lease files, so the directory is split without any
+        coordinator. Safe to re-run; finished items are skipped.
+        """
+        action = f"process_directory_shared {directory}"
+        directory = os.path.expanduser(directory)
+        if not os.path.isdir(directory):
+            printc(f"    ❌ Directory not found: {directory}", Colors.RED)
+            self.save_log(action, "FAIL", "dir missing")
+            return
+        node_id = node_id or f"{platform.node() or 'node'}-{os.getpid()}"
+        files = sorted(f for f in os.listdir(directory) if f.lower().endswith('.apks'))
+        printc(f"    🤝 Node {node_id}: {len(files)} .apks in shared directory.", Colors.CYAN)
+
+        stats = {'node': node_id, 'started': now_ts(), 'done': 0, 'failed': 0, 'lost': 0, 'bytes': 0, 'busy_seconds': 0.0}
+        start = time.time()
+        with LeaseDir(directory, node_id, ttl=ttl) as leases:
+            for f in files:
+                if leases.failures(f) >= max_retries or not leases.claim(f):
+                    continue
+                path = os.path.join(directory, f)
+                printc(f"\n    🔒 Claimed {f}", Colors.BLUE)
+                t0 = time.time()
+                ok = False
+                kept = False
+                try:
+                    ok = (not verify or self.verify_apks(path)) and self.convert_apks_to_apk(path, directory)
+                finally:
+                    kept = leases.release(f, ok, self.apk_output_path(path, directory))
+                stats['busy_seconds'] += time.time() - t0
+                if not kept:
+                    stats['lost'] += 1
+                elif ok:
+                    stats['done'] += 1
+                    stats['bytes'] += os.path.getsize(path)
+                else:
+                    stats['failed'] += 1
+                stats['elapsed'] = time.time() - start
+                leases.write_stats(stats)
+            stats['elapsed'] = time.time() - start
+            stats['finished'] = now_ts()
+            leases.write_stats(stats)
+        printc(f"\n    📈 Node {node_id}: {stats['done']} converted, {stats['failed']} failed.", Colors.GREEN)
+        self.save_log(action, "OK", f"{node_id} {stats['done']} done {stats['failed']} failed")
+        self.show_share_report(directory)
+
+    def show_share_report(self, directory):
+        directory = os.path.expanduser(directory)
+        root = os.path.join(directory, ".zero_two_leases")
+        if not os.path.isdir(root):
+            printc("    ℹ️ No shared-run data in this directory.", Colors.YELLOW)
+            return
+        rows = LeaseDir.read_stats(root)
+        printc("\n    📊 PER-NODE THROUGHPUT:", Colors.CYAN)
+        printc(f"    {'node':<32} {'done':>6} {'failed':>6} {'MB':>9} {'files/min':>10} {'MB/s':>7}", Colors.DIM)
+        for r in rows:
+            elapsed = max(r.get('elapsed', 0.0), 1e-6)
+            mb = r.get('bytes', 0) / (1024*1024)
+            printc(f"    {r['node'][:32]:<32} {r['done']:>6} {r['failed']:>6} {mb:>9.1f} {r['done'] * 60 / elapsed:>10.2f} {mb / elapsed:>7.2f}", Colors.DIM)
+        pending = [f for f in os.listdir(directory)
+                   if f.lower().endswith('.apks') and not os.path.exists(os.path.join(root, f + ".done"))]
+        printc(f"    Remaining unfinished: {len(pending)}", Colors.CYAN)
+
+    def apk_output_path(self, apks_path, output_dir=None):
+        base_name = os.path.splitext(os.path.basename(apks_path))[0]
+        return os.path.join(output_dir or os.path.dirname(apks_path) or os.getcwd(), f"{base_name}.apk")
+
+    def run_journaled(self, journal, jobs):
+        # jobs: [(key, output, fn)] ; fn() -> truthy on success
         success = 0
-        for i, f in enumerate(files, 1):
-            printc(f"\n    🔁 Processing [{i}/{len(files)}] {f}", Colors.BLUE)
-            if self.convert_apks_to_apk(os.path.join(directory, f), directory):
-                success += 1
-        printc(f"\n    📈 SUMMARY: {success}/{len(files)} succeeded.", Colors.GREEN)
-        self.save_log(action, "OK", f"{success}/{len(files)}")
+        try:
+            for i, (key, out, fn) in enumerate(jobs, 1):
+                printc(f"\n    🔁 Processing [{i}/{len(jobs)}] {key}", Colors.BLUE)
+                journal.record(key, 'running', out)
+                try:
+                    ok = fn()
+                except Exception as e:
+                    remove_output(out + ".part")
+                    journal.record(key, 'failed', out, str(e))
+                    continue
+                if ok:
+                    journal.record(key, 'done', out)
+                    success += 1
+                else:
+                    remove_output(out + ".part")
+                    journal.record(key, 'failed', out, "see log")
+        except KeyboardInterrupt:
+            printc("\n    ⚠️ Batch interrupted. Run again with --resume to continue.", Colors.YELLOW)
+            raise
+        journal.close_if_complete()
+        return success
+
+    def journal_pending(self, directory, name):
+        path = os.path.join(os.path.expanduser(directory), name)
+        return os.path.exists(path) and bool(BatchJournal(path).load().unfinished())
+
+    def store_gc(self):
+        action = "store_gc"
+        if not self.store:
+            printc("    ❌ No split store configured (use --store).", Colors.RED)
+            return
+        dropped, removed, freed = self.store.gc()
+        st = self.store.stats()
+        printc(f"    🧹 Store GC: {dropped} stale ref(s), {removed} object(s) removed, {freed / (1024*1024):.2f} MB freed", Colors.GREEN)
+        printc(f"    📦 {st['objects']} object(s), {st['bytes'] / (1024*1024):.2f} MB stored for {st['refs']} output(s) ({st['logical_bytes'] / (1024*1024):.2f} MB logical)", Colors.CYAN)
+        self.save_log(action, "OK", f"{removed} objects, {freed} bytes")
+
+    # ---------------------------
+    # Integrity verification (CRC + central directory)
+    # ---------------------------
+    def verify_apks(self, apks_path, workers=None, quiet=False):
+        """
+        Checks EOCD / central directory consistency of the bundle and of every
+        nested .apk, then CRC-checks all entries across a thread pool. Stored
+        nested APKs are read in place; deflated ones are inflated once into a
+        scratch dir, or checked in place (slower) when scratch space is not
+        available, so quota/scratch problems never count as corruption.
+        """
+        action = f"verify_apks {apks_path}"
+        apks_path = os.path.expanduser(apks_path)
+        if not os.path.exists(apks_path):
+            printc(f"    ❌ Error: {apks_path} not found.", Colors.RED)
+            self.save_log(action, "FAIL", "not found")
+            return False
+
+        workers = workers or min(8, os.cpu_count() or 2)
+        start = time.time()
+        errors = []
+        tasks = []
+        try:
+            with zipfile.ZipFile(apks_path, 'r') as z:
+                nested_infos = [i for i in z.infolist() if i.filename.lower().endswith('.apk') and not i.is_dir()]
+                inflate_size = sum(i.file_size for i in nested_infos if i.compress_type != zipfile.ZIP_STORED)
+        except Exception:
+            nested_infos, inflate_size = [], 0
+        nested_names = {i.filename for i in nested_infos}
+        with contextlib.ExitStack() as stack:
+            # deflated nested APKs are inflated once into scratch and shared by all workers
+            scratch_dir = None
+            if inflate_size:
+                try:
+                    scratch_dir = stack.enter_context(self.scratch.job("verify", inflate_size))
+                except (RuntimeError, OSError) as e:
+                    if not quiet:
+                        printc(f"    ⚠️ No scratch space for nested APKs ({e}); checking them in place", Colors.YELLOW)
+                    self.save_log(action, "WARN", f"in-place nested check: {e}")
+            sources = {}
+            try:
+                with open(apks_path, 'rb') as fp, zipfile.ZipFile(fp, 'r') as z:
+                    errors += check_zip_structure(z, fp, os.path.getsize(apks_path))
+                    for info in z.infolist():
+                        if info.is_dir():
+                            continue
+                        is_apk = info.filename in nested_names
+                        inflated = is_apk and info.compress_type != zipfile.ZIP_STORED
+                        if not (inflated and scratch_dir):
+                            # inflating below already CRC-checks deflated nested APKs
+                            tasks.append((info.compress_size, info.filename, None, info.header_offset))
+                        if not is_apk or errors:
+                            continue
+                        try:
+                            if inflated and not scratch_dir:
+                                errors += self.verify_nested_in_place(z, info)
+                                continue
+                            if info.compress_type == zipfile.ZIP_STORED:
+                                sources[info.filename] = (apks_path, entry_data_offset(fp, info), info.file_size)
+                            else:
+                                fd, tmp = tempfile.mkstemp(suffix=".apk", dir=scratch_dir)
+                                with os.fdopen(fd, 'wb') as dst, z.open(info) as src:
+                                    shutil.copyfileobj(src, dst, VERIFY_CHUNK)
+                                sources[info.filename] = (tmp, 0, info.file_size)
+                            with FileSlice(*sources[info.filename]) as nfp, zipfile.ZipFile(nfp, 'r') as nz:
+                                errors += [f"{info.filename}!{e}" for e in check_zip_structure(nz, nfp, info.file_size)]
+                                for ninfo in nz.infolist():
+                                    if not ninfo.is_dir():
+                                        tasks.append((ninfo.compress_size, info.filename, ninfo.filename, ninfo.header_offset))
+                        except Exception as e:
+                            errors.append(f"{info.filename}: nested APK unreadable ({e})")
+            except Exception as e:
+                errors.append(f"bad archive: {e}")
+
+            if not errors:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    batches = split_balanced(tasks, workers)
+                    for errs in pool.map(lambda b: crc_check_batch(apks_path, b, sources), batches):
+                        errors += errs
+
+        elapsed = time.time() - start
+        if errors:
+            if not quiet:
+                printc(f"    ❌ Integrity check failed: {os.path.basename(apks_path)} ({len(errors)} problem(s))", Colors.RED)
+                for e in errors[:10]:
+                    printc(f"       • {e}", Colors.RED)
+                if len(errors) > 10:
+                    printc(f"       ... and {len(errors) - 10} more", Colors.RED)
+            self.save_log(action, "FAIL", "; ".join(errors[:5]))
+            return False
+        if not quiet:
+            printc(f"    ✅ Integrity OK: {os.path.basename(apks_path)} ({len(tasks)} entries, {elapsed:.2f}s)", Colors.GREEN)
+        self.save_log(action, "OK", f"{len(tasks)} entries")
+        return True
+
+    def verify_nested_in_place(self, z, info):
+        # Scratch-less fallback for a deflated nested APK: read it straight
+        # from the bundle stream, inner entries in file order.
+        errors = []
+        with z.open(info) as nfp, zipfile.ZipFile(nfp, 'r') as nz:
+            errors += [f"{info.filename}!{e}" for e in check_zip_structure(nz, nfp, info.file_size)]
+            for ninfo in sorted(nz.infolist(), key=lambda i: i.header_offset):
+                if ninfo.is_dir():
+                    continue
+                try:
+                    with nz.open(ninfo) as src:
+                        while src.read(VERIFY_CHUNK):
+                            pass
+                except Exception as e:
+                    errors.append(f"{info.filename}!{ninfo.filename}: {e}")
+        return errors
+
+    def verify_batch(self, directory, files):
+        # Pre-step for batch runs: drop corrupt bundles before any output is written
+        printc("    🔬 Verifying bundle integrity...", Colors.CYAN)
+        good = [f for f in files if self.verify_apks(os.path.join(directory, f))]
+        bad = len(files) - len(good)
+        if bad:
+            printc(f"    ⚠️ Skipping {bad} corrupt bundle(s).", Colors.YELLOW)
+        return good
 
     # ---------------------------
     # Decompile with apktool (no timeout)
@@ -280,7 +1747,7 @@ class ZeroTwo:
             pass
         return "Not installed"
 
-    def decompile_apk(self, apk_path):
+    def decompile_apk(self, apk_path, profile='full', only_dex=None):
         action = f"decompile_apk {apk_path}"
         if self.apktool_version == "Not installed":
             printc("    ❌ apktool not installed. Run 'Install dependencies' first.", Colors.RED)
@@ -293,12 +1760,33 @@ class ZeroTwo:
             self.save_log(action, "FAIL", "apk missing")
             return False
 
+        if only_dex:
+            profile = 'dex'
+        if profile not in DECOMPILE_PROFILES:
+            printc(f"    ❌ Unknown decompile profile: {profile}", Colors.RED)
+            self.save_log(action, "FAIL", f"profile {profile}")
+            return False
+        if profile == 'dex':
+            try:
+                with zipfile.ZipFile(apk_path, 'r') as z:
+                    dex_names = [n for n in z.namelist() if re.fullmatch(r'classes\d*\.dex', n)]
+            except Exception as e:
+                printc(f"    ❌ Cannot read APK: {e}", Colors.RED)
+                self.save_log(action, "FAIL", str(e))
+                return False
+            if only_dex not in dex_names:
+                printc(f"    ❌ {only_dex} not in APK (has: {', '.join(sorted(dex_names)) or 'no dex'})", Colors.RED)
+                self.save_log(action, "FAIL", f"{only_dex} missing")
+                return False
+
         base_dir = os.path.dirname(apk_path)
         name = os.path.splitext(os.path.basename(apk_path))[0]
         out_dir = os.path.join(base_dir, f"{name}_decompiled")
 
         printc(f"\n    📄 APK: {os.path.basename(apk_path)}", Colors.CYAN)
         printc(f"    📂 Output: {out_dir}", Colors.CYAN)
+        if profile != 'full':
+            printc(f"    🎯 Profile: {profile}{' (' + only_dex + ')' if only_dex else ''}", Colors.CYAN)
         printc("    ⏳ Decompilation may take several minutes depending on size (approx. 5 minutes for large apps).", Colors.YELLOW)
 
         if not self.headless:
@@ -320,7 +1808,7 @@ class ZeroTwo:
 
         # Run apktool and stream output; show intermittent spinner/progress
         try:
-            proc = subprocess.Popen(['apktool', 'd', apk_path, '-o', out_dir, '-f'],
+            proc = subprocess.Popen(['apktool', 'd', apk_path, '-o', out_dir, '-f'] + DECOMPILE_PROFILES[profile],
                                     stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
 
             start = time.time()
@@ -344,7 +1832,11 @@ class ZeroTwo:
 
             ret = proc.poll()
             elapsed = int(time.time() - start)
+            if ret == 0 and profile != 'full' and not self.finish_decompile_profile(apk_path, out_dir, profile, only_dex):
+                self.save_log(action, "FAIL", f"profile {profile} post-processing")
+                return False
             if ret == 0:
+                elapsed = int(time.time() - start)
                 printc(f"    ✅ Decompilation completed in {elapsed}s", Colors.GREEN)
                 self.save_log(action, "OK", out_dir)
                 self.show_decompile_stats(out_dir)
@@ -366,6 +1858,53 @@ class ZeroTwo:
             self.save_log(action, "FAIL", str(e))
             return False
 
+    def finish_decompile_profile(self, apk_path, out_dir, profile, only_dex=None):
+        # Decode the single requested dex, drop raw dex apktool copied in (they
+        # are spliced back from the source APK on rebuild) and record the profile.
+        with zipfile.ZipFile(apk_path, 'r') as z:
+            dex_names = sorted(n for n in z.namelist() if re.fullmatch(r'classes\d*\.dex', n))
+            dex_size = sum(z.getinfo(n).file_size for n in dex_names)
+        decoded = {'no-src': ['resources', 'manifest'], 'no-res': ['sources'],
+                   'manifest': ['manifest'], 'dex': [only_dex]}[profile]
+        skipped = {'no-src': ['sources'], 'no-res': ['resources (kept raw)'],
+                   'manifest': ['sources', 'resources (kept raw)'], 'dex': ['resources (kept raw)']}[profile]
+        splice = []
+        try:
+            if profile == 'dex':
+                with self.scratch.job("dex", dex_size) as tmp:
+                    stub = os.path.join(tmp, "stub.apk")
+                    with zipfile.ZipFile(apk_path, 'r') as zs, zipfile.ZipFile(stub, 'w', zipfile.ZIP_STORED) as zd:
+                        zd.writestr('classes.dex', zs.read(only_dex))
+                    rc, out = self.run_cmd(['apktool', 'd', stub, '-o', os.path.join(tmp, 'out'), '-f', '-r'], capture=True)
+                    src_smali = os.path.join(tmp, 'out', 'smali')
+                    if rc != 0 or not os.path.isdir(src_smali):
+                        printc(f"    ❌ Decoding {only_dex} failed: {out}", Colors.RED)
+                        return False
+                    smali_dir = 'smali' if only_dex == 'classes.dex' else f"smali_{os.path.splitext(only_dex)[0]}"
+                    shutil.rmtree(os.path.join(out_dir, smali_dir), ignore_errors=True)
+                    shutil.move(src_smali, os.path.join(out_dir, smali_dir))
+                skipped += [n for n in dex_names if n != only_dex]
+            if profile in ('no-src', 'manifest', 'dex'):
+                for n in dex_names:
+                    raw = os.path.join(out_dir, n)
+                    if os.path.exists(raw):
+                        os.remove(raw)
+                splice = [n for n in dex_names if n != only_dex]
+            with open(os.path.join(out_dir, DECOMPILE_PROFILE_FILE), 'w', encoding='utf-8') as f:
+                json.dump({
+                    'profile': profile, 'only_dex': only_dex, 'created': now_ts(),
+                    'source_apk': os.path.abspath(apk_path),
+                    'source_size': os.path.getsize(apk_path), 'source_mtime': os.path.getmtime(apk_path),
+                    'decoded': decoded, 'skipped': skipped, 'splice': splice,
+                    # decoded manifest + raw resources can't be recompiled by aapt
+                    'rebuildable': profile != 'manifest',
+                }, f, indent=2)
+        except Exception as e:
+            printc(f"    ❌ Profile post-processing failed: {e}", Colors.RED)
+            return False
+        printc(f"    ⏭️ Skipped: {', '.join(skipped)}", Colors.DIM)
+        return True
+
     def show_decompile_stats(self, output_dir):
         try:
             if not os.path.exists(output_dir):
@@ -410,6 +1949,56 @@ class ZeroTwo:
         except Exception as e:
             printc(f"    ⚠️ Could not compute stats: {e}", Colors.YELLOW)
 
+    # ---------------------------
+    # Smali index & search
+    # ---------------------------
+    def build_smali_index(self, decompiled_dir):
+        action = f"build_smali_index {decompiled_dir}"
+        decompiled_dir = os.path.expanduser(decompiled_dir)
+        if not os.path.isdir(decompiled_dir):
+            printc(f"    ❌ Decompiled directory not found: {decompiled_dir}", Colors.RED)
+            self.save_log(action, "FAIL", "dir missing")
+            return None
+        start = time.time()
+        try:
+            idx = SmaliIndex(decompiled_dir)
+            changed, removed, total = idx.update()
+            idx.close()
+        except Exception as e:
+            printc(f"    ❌ Indexing failed: {e}", Colors.RED)
+            self.save_log(action, "FAIL", str(e))
+            return None
+        printc(f"    🗂️ Index up to date: {total} files ({changed} re-indexed, {removed} removed) in {time.time() - start:.2f}s", Colors.GREEN)
+        printc(f"    📄 {idx.path}", Colors.DIM)
+        self.save_log(action, "OK", f"{changed} changed, {removed} removed, {total} total")
+        return idx.path
+
+    def search_smali_index(self, decompiled_dir, query, kind=None, limit=50):
+        action = f"search_smali_index {decompiled_dir}"
+        decompiled_dir = os.path.expanduser(decompiled_dir)
+        db_path = os.path.abspath(decompiled_dir).rstrip(os.sep) + ".index.db"
+        if not os.path.exists(db_path) and not self.build_smali_index(decompiled_dir):
+            return []
+        start = time.time()
+        idx = SmaliIndex(decompiled_dir)
+        try:
+            # cheap when nothing changed (stat only); keeps hits current after edits
+            try:
+                changed, removed, _ = idx.update()
+                if changed or removed:
+                    printc(f"    🗂️ Index refreshed: {changed} re-indexed, {removed} removed", Colors.DIM)
+            except Exception as e:
+                printc(f"    ⚠️ Could not refresh index ({e}); results may be stale", Colors.YELLOW)
+            rows = idx.search(query, kind=kind, limit=limit)
+        finally:
+            idx.close()
+        for k, term, path, line in rows:
+            printc(f"    {Colors.colorize(k.ljust(6), Colors.CYAN)} {term}", None)
+            printc(f"           {path}:{line}", Colors.DIM)
+        printc(f"    🔎 {len(rows)} match(es) in {(time.time() - start) * 1000:.0f} ms", Colors.GREEN if rows else Colors.YELLOW)
+        self.save_log(action, "OK", f"{query!r}: {len(rows)}")
+        return rows
+
     # ---------------------------
     # Rebuild (apktool b)
     # ---------------------------
@@ -422,10 +2011,32 @@ class ZeroTwo:
             return False
         if not output_apk:
             output_apk = os.path.join(os.path.dirname(decompiled_dir), os.path.basename(decompiled_dir) + "_rebuilt.apk")
+        profile = None
+        profile_file = os.path.join(decompiled_dir, DECOMPILE_PROFILE_FILE)
+        if os.path.exists(profile_file):
+            with open(profile_file, 'r', encoding='utf-8') as f:
+                profile = json.load(f)
+            if not profile.get('rebuildable', True):
+                printc(f"    ❌ '{profile['profile']}' decompiles can't be rebuilt; decompile with the full or --no-res profile.", Colors.RED)
+                self.save_log(action, "FAIL", f"profile {profile['profile']}")
+                return False
+            src = profile.get('source_apk')
+            if profile.get('splice') and not (src and os.path.exists(src)):
+                printc(f"    ❌ Source APK needed to splice skipped parts is missing: {src}", Colors.RED)
+                self.save_log(action, "FAIL", "source apk missing")
+                return False
+            if src and (os.path.getsize(src), os.path.getmtime(src)) != (profile.get('source_size'), profile.get('source_mtime')):
+                printc("    ⚠️ Source APK changed since decompilation; spliced parts come from the current file.", Colors.YELLOW)
         printc(f"    🔧 Rebuilding from: {decompiled_dir}", Colors.CYAN)
+        # build and splice into .part; output_apk only appears once it's complete
+        part = output_apk + ".part"
         try:
-            rc, out = self.run_cmd(['apktool', 'b', decompiled_dir, '-o', output_apk], capture=True)
+            rc, out = self.run_cmd(['apktool', 'b', decompiled_dir, '-o', part], capture=True)
+            if rc == 0 and profile and profile.get('splice'):
+                spliced = zip_splice_raw(part, profile['source_apk'], profile['splice'])
+                printc(f"    🧩 Spliced {len(spliced)} untouched entr{'y' if len(spliced) == 1 else 'ies'} from the source APK: {', '.join(spliced)}", Colors.CYAN)
             if rc == 0:
+                os.replace(part, output_apk)
                 printc(f"    ✅ Rebuild succeeded: {output_apk}", Colors.GREEN)
                 self.save_log(action, "OK", output_apk)
                 return output_apk
@@ -437,6 +2048,9 @@ class ZeroTwo:
             printc(f"    ❌ Error rebuilding: {e}", Colors.RED)
             self.save_log(action, "FAIL", str(e))
             return False
+        finally:
+            if os.path.exists(part):
+                os.remove(part)
 
     # ---------------------------
     # Signing
@@ -520,33 +2134,166 @@ class ZeroTwo:
 
         # Fallback: use apktool to extract manifest (no src)
         if self.apktool_version != "Not installed":
-            temp_dir = tempfile.mkdtemp(prefix="zero_two_info_")
             try:
-                subprocess.run(['apktool', 'd', apk_path, '-o', temp_dir, '-f', '--no-src'], capture_output=True, text=True, timeout=60)
-                manifest = os.path.join(temp_dir, 'AndroidManifest.xml')
-                if os.path.exists(manifest):
-                    printc("    📄 AndroidManifest.xml (first 80 lines):", Colors.DIM)
-                    with open(manifest, 'r', encoding='utf-8', errors='ignore') as f:
-                        for i, ln in enumerate(f):
-                            if i >= 80: break
-                            printc(f"    {ln.rstrip()}", Colors.DIM)
-                    self.save_log(action, "OK", "manifest shown")
-                else:
-                    printc("    ⚠️ Manifest not found after apktool extraction.", Colors.YELLOW)
-                    self.save_log(action, "FAIL", "manifest missing")
+                with self.scratch.job("info", bundle_size(apk_path)) as temp_dir:
+                    subprocess.run(['apktool', 'd', apk_path, '-o', temp_dir, '-f', '--no-src'], capture_output=True, text=True, timeout=60)
+                    manifest = os.path.join(temp_dir, 'AndroidManifest.xml')
+                    if os.path.exists(manifest):
+                        printc("    📄 AndroidManifest.xml (first 80 lines):", Colors.DIM)
+                        with open(manifest, 'r', encoding='utf-8', errors='ignore') as f:
+                            for i, ln in enumerate(f):
+                                if i >= 80: break
+                                printc(f"    {ln.rstrip()}", Colors.DIM)
+                        self.save_log(action, "OK", "manifest shown")
+                    else:
+                        printc("    ⚠️ Manifest not found after apktool extraction.", Colors.YELLOW)
+                        self.save_log(action, "FAIL", "manifest missing")
             except Exception as e:
                 printc(f"    ❌ Error extracting manifest: {e}", Colors.RED)
                 self.save_log(action, "FAIL", str(e))
-            finally:
-                shutil.rmtree(temp_dir, ignore_errors=True)
         else:
             printc("    ⚠️ Cannot show APK info: aapt and apktool not available.", Colors.YELLOW)
             self.save_log(action, "FAIL", "no tools")
 
+    # ---------------------------
+    # Size breakdown (zip metadata only)
+    # ---------------------------
+    def size_report(self, path, top=15, as_json=False):
+        action = f"size_report {path}"
+        path = os.path.expanduser(path)
+        if not os.path.exists(path):
+            printc(f"    ❌ File not found: {path}", Colors.RED)
+            self.save_log(action, "FAIL", "missing")
+            return None
+        start = time.time()
+        try:
+            report = size_breakdown(path, top=top)
+        except Exception as e:
+            printc(f"    ❌ Cannot read zip metadata: {e}", Colors.RED)
+            self.save_log(action, "FAIL", str(e))
+            return None
+        report['elapsed_ms'] = round((time.time() - start) * 1000, 1)
+        if as_json:
+            print(json.dumps(report, indent=2))
+            self.save_log(action, "OK", "json")
+            return report
+
+        mb = lambda n: n / (1024*1024)
+        total = report['file_size'] or 1
+        printc(f"\n    📦 SIZE REPORT: {os.path.basename(path)} ({mb(report['file_size']):.2f} MB on disk)", Colors.CYAN)
+        printc(f"    Compressed {mb(report['compressed']):.2f} MB / uncompressed {mb(report['uncompressed']):.2f} MB", Colors.CYAN)
+        sections = [('SPLITS', 'splits'), ('TOP-LEVEL PATHS', 'top_level'), ('DEX', 'dex'), ('ABIS', 'abi'), (f'TOP {top} ENTRIES', 'largest')]
+        for title, key in sections:
+            rows = report[key] if key == 'largest' else report[key][:top]
+            if not rows:
+                continue
+            printc(f"\n    {title}:", Colors.MAGENTA)
+            for r in rows:
+                pct = r['compressed'] * 100 / total
+                printc(f"    {mb(r['compressed']):>9.2f} MB {mb(r['uncompressed']):>9.2f} MB {pct:>6.1f}%  {r['name']}", Colors.DIM)
+        printc(f"\n    ⏱️ {report['elapsed_ms']} ms (columns: compressed, uncompressed, % of file size)", Colors.DIM)
+        self.save_log(action, "OK", f"{report['compressed']} bytes compressed")
+        return report
+
+    # ---------------------------
+    # Inventory (whole directories -> CSV / JSON lines)
+    # ---------------------------
+    def inventory_directory(self, directory, output=None, fmt='csv', workers=None):
+        action = f"inventory_directory {directory}"
+        directory = os.path.expanduser(directory)
+        if not os.path.isdir(directory):
+            printc(f"    ❌ Directory not found: {directory}", Colors.RED)
+            self.save_log(action, "FAIL", "dir missing")
+            return False
+        paths = []
+        for root, _, files in os.walk(directory):
+            for f in files:
+                if f.lower().endswith(('.apk', '.apks')):
+                    paths.append(os.path.abspath(os.path.join(root, f)))
+        paths.sort()
+        output = output or os.path.join(os.getcwd(), f"inventory.{'csv' if fmt == 'csv' else 'jsonl'}")
+        printc(f"    📋 Inventory of {len(paths)} file(s) -> {output}", Colors.CYAN)
+
+        cache_path = os.path.join(self.cache_dir, "inventory_cache.json")
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+
+        todo = []
+        stamps = {}
+        for p in paths:
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            stamps[p] = [st.st_size, st.st_mtime]
+            hit = cache.get(p)
+            if not hit or hit.get('stamp') != stamps[p]:
+                todo.append(p)
+        printc(f"    ♻️ {len(stamps) - len(todo)} cached, {len(todo)} to scan.", Colors.CYAN)
+
+        start = time.time()
+        errors = 0
+        done = 0
+        with open(output, 'w', encoding='utf-8', newline='') as out:
+            writer = csv.DictWriter(out, fieldnames=INVENTORY_FIELDS) if fmt == 'csv' else None
+            if writer:
+                writer.writeheader()
+
+            def emit(row):
+                if writer:
+                    writer.writerow(row)
+                else:
+                    out.write(json.dumps(row) + "\n")
+
+            for p in stamps:
+                if p not in todo:
+                    emit(cache[p]['row'])
+            done = len(stamps) - len(todo)
+
+            emitted = set()
+
+            def scanned(rows):
+                nonlocal done, errors
+                for row in rows:
+                    p = row['path']
+                    emitted.add(p)
+                    if row['error']:
+                        errors += 1
+                    else:
+                        cache[p] = {'stamp': stamps[p], 'row': row}
+                    emit(row)
+                    done += 1
+                    if not self.headless and (done % 50 == 0 or done == len(stamps)):
+                        self.print_progress(done, len(stamps), prefix="    Scanning")
+
+            if todo:
+                try:
+                    with ProcessPoolExecutor(max_workers=workers) as pool:
+                        scanned(pool.map(inventory_apk, todo, chunksize=16))
+                except (OSError, ImportError, NotImplementedError, BrokenProcessPool):
+                    # no working multiprocessing / a worker died: scan inline whatever wasn't written yet
+                    scanned(inventory_apk(p) for p in todo if p not in emitted)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(cache_path + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(cache_path + ".tmp", cache_path)
+        except OSError as e:
+            printc(f"    ⚠️ Could not save inventory cache: {e}", Colors.YELLOW)
+
+        elapsed = time.time() - start
+        printc(f"    ✅ Inventory written: {len(stamps)} row(s), {errors} error(s) in {elapsed:.1f}s", Colors.GREEN)
+        self.save_log(action, "OK", f"{len(stamps)} rows, {errors} errors -> {output}")
+        return True
+
     # ---------------------------
     # Auto mode
     # ---------------------------
-    def auto_mode(self, directory):
+    def auto_mode(self, directory, resume=False, max_retries=3):
         action = f"auto_mode {directory}"
         directory = os.path.expanduser(directory)
         if not os.path.isdir(directory):
@@ -561,14 +2308,32 @@ class ZeroTwo:
         printc(f"    🔎 Scanning {directory} -> {len(apks)} .apks, {len(apk_files)} .apk", Colors.CYAN)
         self.save_log(action, "OK", f"{len(apks)} .apks, {len(apk_files)} .apk")
 
-        for a in apks:
-            self.convert_apks_to_apk(os.path.join(directory, a), directory)
-
-        if apk_files and not self.headless:
+        journal = BatchJournal(os.path.join(directory, ".zero_two_auto.journal"))
+        outputs = {f"convert:{a}": self.apk_output_path(os.path.join(directory, a), directory) for a in sorted(apks)}
+        decompile = bool(apk_files) and not self.headless
+        if decompile:
             cont = input("\n    Decompile all found .apk files? (y/n): ").strip().lower()
-            if cont in ['y', 'yes', 's', 'si']:
-                for a in apk_files:
-                    self.decompile_apk(os.path.join(directory, a))
+            decompile = cont in ['y', 'yes', 's', 'si']
+        if decompile:
+            for a in sorted(apk_files):
+                outputs[f"decompile:{a}"] = os.path.join(directory, os.path.splitext(a)[0] + "_decompiled")
+        todo = journal.plan(outputs, resume=resume, max_retries=max_retries)
+
+        convert_todo = [k.split(':', 1)[1] for k in todo if k.startswith('convert:')]
+        good = set(self.verify_batch(directory, convert_todo)) if convert_todo else set()
+        jobs = []
+        for key in todo:
+            kind, name = key.split(':', 1)
+            path = os.path.join(directory, name)
+            if kind == 'convert':
+                if name not in good:
+                    journal.record(key, 'running', outputs[key])
+                    journal.record(key, 'failed', outputs[key], "integrity check failed")
+                    continue
+                jobs.append((key, outputs[key], lambda p=path: self.convert_apks_to_apk(p, directory)))
+            else:
+                jobs.append((key, outputs[key], lambda p=path: self.decompile_apk(p)))
+        self.run_journaled(journal, jobs)
 
         printc("    ✅ Auto mode finished.", Colors.GREEN)
         self.save_log(action, "OK", "finished")
@@ -599,38 +2364,160 @@ class ZeroTwo:
     # ---------------------------
     # Update handling (check and optional download)
     # ---------------------------
-    def check_for_updates(self, interactive=True):
+    def load_update_cache(self):
+        try:
+            with open(self.update_cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_update_cache(self, cache):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self.update_cache_file + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(self.update_cache_file + ".tmp", self.update_cache_file)
+        except OSError:
+            pass
+
+    def http_get(self, url, headers=None, timeout=15, stream=False):
         """
-        Checks GitHub releases (github_api_release) and if newer version exists,
-        prompts to download and replace the current script.
+        GET via requests when installed, else urllib. Returns (status, headers, body);
+        with stream=True body is a file-like object the caller must close.
         """
-        action = "check_for_updates"
-        printc("    🔎 Checking for updates...", Colors.CYAN)
-        # Try to use requests if available; otherwise try curl
-        json_text = None
+        headers = dict(headers or {})
+        headers.setdefault('User-Agent', f"zero-two/{self.version}")
         try:
             import requests
+        except ImportError:
+            requests = None
+        if requests:
+            r = requests.get(url, headers=headers, timeout=timeout, stream=stream)
+            if stream:
+                r.raw.decode_content = True
+                return r.status_code, r.headers, r.raw
+            return r.status_code, r.headers, r.content
+        import urllib.request
+        import urllib.error
+        try:
+            resp = urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout)
+        except urllib.error.HTTPError as e:
+            # 304 Not Modified lands here too
+            return e.code, e.headers, b""
+        if stream:
+            return resp.status, resp.headers, resp
+        with resp:
+            return resp.status, resp.headers, resp.read()
+
+    def fetch_release_info(self, force=False):
+        """
+        Latest release JSON, cached in cache/update_release.json. Within
+        UPDATE_RECHECK_SECONDS the cache is used as-is (unless force); after
+        that GitHub is asked conditionally (If-None-Match), so an unchanged
+        release costs a 304 instead of the full payload.
+        """
+        cache = self.load_update_cache()
+        fresh = time.time() - cache.get('checked_at', 0) < UPDATE_RECHECK_SECONDS
+        if cache.get('release') and fresh and not force:
+            return cache['release']
+        headers = {'Accept': 'application/vnd.github+json'}
+        if cache.get('etag') and cache.get('release'):
+            headers['If-None-Match'] = cache['etag']
+        try:
+            status, resp_headers, body = self.http_get(self.github_api_release, headers=headers, timeout=15)
+        except Exception as e:
+            self.save_log("fetch_release_info", "FAIL", str(e))
+            return cache.get('release')
+        if status == 304:
+            cache['checked_at'] = time.time()
+            self.save_update_cache(cache)
+            return cache['release']
+        if status != 200:
+            self.save_log("fetch_release_info", "FAIL", f"http {status}")
+            return cache.get('release')
+        try:
+            release = json.loads(body)
+        except ValueError:
+            return cache.get('release')
+        self.save_update_cache({'etag': resp_headers.get('ETag'), 'checked_at': time.time(), 'release': release})
+        return release
+
+    def is_newer(self, tag):
+        def parts(v):
+            return tuple(int(x) if x.isdigit() else 0 for x in re.findall(r'\d+', str(v)))
+        return bool(tag) and parts(tag) > parts(self.version)
+
+    def start_background_update_check(self):
+        # Runs once per session in a daemon thread; the menu just reads self.update_notice
+        def worker():
             try:
-                r = requests.get(self.github_api_release, timeout=15)
-                if r.status_code == 200:
-                    json_text = r.json()
+                release = self.fetch_release_info()
+                tag = release and (release.get('tag_name') or release.get('name'))
+                if self.is_newer(tag):
+                    self.update_notice = tag
             except Exception as e:
-                printc(f"    ⚠️ Network error using requests: {e}", Colors.YELLOW)
-        except Exception:
-            # fallback to curl if available
-            if shutil.which('curl'):
+                self.save_log("background_update_check", "FAIL", str(e))
+        threading.Thread(target=worker, name="zero_two_update_check", daemon=True).start()
+
+    def expected_sha256(self, release, asset):
+        # GitHub's asset "digest" field, else a <name>.sha256 / SHA256SUMS asset
+        digest = asset.get('digest') or ''
+        if digest.startswith('sha256:'):
+            return digest.split(':', 1)[1].lower()
+        name = asset.get('name', '')
+        for a in release.get('assets') or []:
+            if a.get('name') in (name + '.sha256', 'SHA256SUMS', 'SHA256SUMS.txt', 'sha256sums.txt'):
                 try:
-                    rc, out = self.run_cmd(['curl', '-sL', self.github_api_release], capture=True, timeout=15)
-                    if rc == 0 and out:
-                        import json
-                        json_text = json.loads(out)
-                except Exception as e:
-                    printc(f"    ⚠️ curl fallback failed: {e}", Colors.YELLOW)
-            else:
-                printc("    ⚠️ Neither 'requests' nor 'curl' available to check updates. Install 'requests' or 'curl'.", Colors.YELLOW)
-                self.save_log(action, "FAIL", "no-network-tool")
-                return
+                    status, _, body = self.http_get(a.get('browser_download_url'), timeout=30)
+                except Exception:
+                    continue
+                if status != 200:
+                    continue
+                for line in body.decode('utf-8', errors='ignore').splitlines():
+                    fields = line.split()
+                    if fields and re.fullmatch(r'[0-9a-fA-F]{64}', fields[0]):
+                        if len(fields) == 1 or fields[-1].lstrip('*') == name:
+                            return fields[0].lower()
+        return None
 
+    def download_file(self, url, dest):
+        # Streams url to dest in DOWNLOAD_CHUNK blocks; returns the SHA-256 of what was written
+        h = hashlib.sha256()
+        status, headers, body = self.http_get(url, timeout=60, stream=True)
+        try:
+            if status != 200:
+                raise RuntimeError(f"HTTP {status}")
+            total = int(headers.get('content-length') or 0)
+            downloaded = 0
+            last_draw = 0.0
+            with open(dest, 'wb') as f:
+                while True:
+                    chunk = body.read(DOWNLOAD_CHUNK)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    h.update(chunk)
+                    downloaded += len(chunk)
+                    now = time.time()
+                    if now - last_draw >= PROGRESS_INTERVAL:
+                        self.print_progress(downloaded, total, prefix="    Downloading")
+                        last_draw = now
+                f.flush()
+                os.fsync(f.fileno())
+            self.print_progress(total or downloaded, total or downloaded, prefix="    Downloading")
+        finally:
+            body.close()
+        return h.hexdigest()
+
+    def check_for_updates(self, interactive=True, force=True):
+        """
+        Checks GitHub releases (github_api_release) and if newer version exists,
+        prompts to download it. A single-script asset replaces the current script
+        atomically, and only after its SHA-256 matches the published digest.
+        """
+        action = "check_for_updates"
+        printc("    🔎 Checking for updates...", Colors.CYAN)
+        json_text = self.fetch_release_info(force=force)
         if not json_text:
             printc("    ⚠️ Could not fetch release info from GitHub.", Colors.YELLOW)
             self.save_log(action, "FAIL", "no release info")
@@ -638,101 +2525,73 @@ class ZeroTwo:
 
         # parse release
         latest_tag = json_text.get('tag_name') or json_text.get('name') or json_text.get('id')
-        latest_name = json_text.get('name') or latest_tag
         assets = json_text.get('assets') or []
-        latest_url_html = json_text.get('html_url') or f"https://github.com/CHICO-CP/zero-two-toolkit/releases/latest"
-        # Compare versions naively (string compare); we can parse semver if needed
-        if latest_tag and latest_tag.strip() != self.version:
-            printc(f"    🚀 New version available: {latest_tag}", Colors.MAGENTA)
-            printc(f"    🔗 Release page: {latest_url_html}", Colors.CYAN)
-            self.save_log(action, "OK", f"latest {latest_tag}")
-            if interactive and not self.headless:
-                ans = input("    Would you like to update Zero Two now? (y/n): ").strip().lower()
-            else:
-                ans = 'n'
-            if ans in ['y', 'yes', 's', 'si']:
-                # Determine asset to download: prefer a direct python script or zip asset
-                download_url = None
-                if assets:
-                    # prefer asset with .py or .zip
-                    for a in assets:
-                        name = a.get('name', '')
-                        if name.endswith('.py') or name.endswith('.zip') or name.endswith('.tar.gz'):
-                            download_url = a.get('browser_download_url')
-                            break
-                    if not download_url:
-                        download_url = assets[0].get('browser_download_url')
-                else:
-                    # fallback: attempt to download the "latest" release tarball
-                    download_url = json_text.get('tarball_url') or json_text.get('zipball_url')
-
-                if not download_url:
-                    printc("    ❌ No downloadable asset found in release. Please update manually.", Colors.RED)
-                    return
+        latest_url_html = json_text.get('html_url') or "https://github.com/CHICO-CP/zero-two-toolkit/releases/latest"
+        if not self.is_newer(latest_tag):
+            printc("    ✅ Zero Two is already up to date.", Colors.GREEN)
+            self.save_log(action, "OK", f"version {self.version}")
+            return
 
-                printc(f"    ⏬ Downloading: {download_url}", Colors.CYAN)
-                tmp_file = os.path.join(tempfile.gettempdir(), f"zero_two_update_{int(time.time())}")
-                try:
-                    # try requests download if available
-                    try:
-                        import requests
-                        with requests.get(download_url, stream=True, timeout=60) as r:
-                            r.raise_for_status()
-                            total = int(r.headers.get('content-length', 0))
-                            with open(tmp_file, 'wb') as f:
-                                downloaded = 0
-                                for chunk in r.iter_content(chunk_size=8192):
-                                    if chunk:
-                                        f.write(chunk)
-                                        downloaded += len(chunk)
-                                        # progress
-                                        self.print_progress(downloaded, total, prefix="    Downloading")
-                    except Exception:
-                        # fallback to curl
-                        if shutil.which('curl'):
-                            rc, out = self.run_cmd(['curl', '-L', '-o', tmp_file, download_url], capture=True, timeout=300)
-                            if rc != 0:
-                                raise RuntimeError(f"curl failed: {out}")
-                        else:
-                            raise RuntimeError("No download method available (requests and curl both missing).")
+        printc(f"    🚀 New version available: {latest_tag}", Colors.MAGENTA)
+        printc(f"    🔗 Release page: {latest_url_html}", Colors.CYAN)
+        self.save_log(action, "OK", f"latest {latest_tag}")
+        if interactive and not self.headless:
+            ans = input("    Would you like to update Zero Two now? (y/n): ").strip().lower()
+        else:
+            ans = 'n'
+        if ans not in ['y', 'yes', 's', 'si']:
+            printc("    ⚠️ Update cancelled by user.", Colors.YELLOW)
+            return
 
-                    # Now determine how to replace current script:
-                    cur_path = os.path.abspath(sys.argv[0])
-                    backup_path = cur_path + ".bak"
-                    try:
-                        # Make a backup
-                        shutil.copy2(cur_path, backup_path)
-                    except Exception:
-                        pass
+        # prefer a direct python script, then an archive
+        asset = next((a for a in assets if a.get('name', '').endswith('.py')), None)
+        asset = asset or next((a for a in assets if a.get('name', '').endswith(('.zip', '.tar.gz'))), None)
+        if not asset:
+            printc("    ❌ No downloadable asset found in release. Please update manually.", Colors.RED)
+            self.save_log(action, "FAIL", "no asset")
+            return
+        download_url = asset.get('browser_download_url')
+        expected = self.expected_sha256(json_text, asset)
+        is_script = asset.get('name', '').endswith('.py')
+
+        printc(f"    ⏬ Downloading: {download_url}", Colors.CYAN)
+        cur_path = self.script_path
+        # same directory as the target so the final os.replace is atomic
+        tmp_file = (cur_path + ".download") if is_script else os.path.join(tempfile.gettempdir(), asset['name'])
+        try:
+            actual = self.download_file(download_url, tmp_file)
+            if not expected:
+                printc("    ⚠️ Release publishes no SHA-256 for this asset; not installing it automatically.", Colors.YELLOW)
+                printc(f"    Downloaded to {tmp_file} (sha256 {actual}). Verify and install manually.", Colors.YELLOW)
+                self.save_log(action, "FAIL", f"no digest, kept {tmp_file}")
+                return
+            if actual != expected:
+                os.remove(tmp_file)
+                printc(f"    ❌ Checksum mismatch (expected {expected}, got {actual}). Download discarded.", Colors.RED)
+                self.save_log(action, "FAIL", "sha256 mismatch")
+                return
+            printc("    🔐 SHA-256 verified.", Colors.GREEN)
 
-                    # If asset is a single .py, just replace; if zip/tar, we can't auto-extract reliably -> ask user
-                    if download_url.endswith('.py'):
-                        shutil.copy2(tmp_file, cur_path)
-                        printc(f"\n    🎉 Zero Two has been successfully updated to {latest_tag}!", Colors.GREEN)
-                        printc("    Please restart the tool manually to apply the changes.", Colors.YELLOW)
-                        self.save_log(action, "OK", f"updated {latest_tag}")
-                    else:
-                        # If it's an archive, suggest manual steps
-                        printc("\n    ⚠️ Downloaded package is an archive. Automatic replacement not performed.", Colors.YELLOW)
-                        printc(f"    Please extract the archive from: {tmp_file} and replace the script manually.", Colors.YELLOW)
-                        self.save_log(action, "OK", f"downloaded archive {tmp_file}")
-                except Exception as e:
-                    printc(f"    ❌ Update failed: {e}", Colors.RED)
-                    self.save_log(action, "FAIL", str(e))
-                finally:
-                    try:
-                        if os.path.exists(tmp_file) and not download_url.endswith('.py'):
-                            # keep archive for manual install
-                            pass
-                        elif os.path.exists(tmp_file):
-                            os.remove(tmp_file)
-                    except Exception:
-                        pass
+            if is_script:
+                try:
+                    shutil.copy2(cur_path, cur_path + ".bak")
+                    shutil.copymode(cur_path, tmp_file)
+                except OSError:
+                    pass
+                os.replace(tmp_file, cur_path)
+                printc(f"\n    🎉 Zero Two has been successfully updated to {latest_tag}!", Colors.GREEN)
+                printc("    Please restart the tool manually to apply the changes.", Colors.YELLOW)
+                self.save_log(action, "OK", f"updated {latest_tag}")
             else:
-                printc("    ⚠️ Update cancelled by user.", Colors.YELLOW)
-        else:
-            printc("    ✅ Zero Two is already up to date.", Colors.GREEN)
-            self.save_log(action, "OK", f"version {self.version}")
+                # archives can't be swapped in reliably -> manual steps
+                printc("\n    ⚠️ Downloaded package is an archive. Automatic replacement not performed.", Colors.YELLOW)
+                printc(f"    Please extract the archive from: {tmp_file} and replace the script manually.", Colors.YELLOW)
+                self.save_log(action, "OK", f"downloaded archive {tmp_file}")
+        except Exception as e:
+            printc(f"\n    ❌ Update failed: {e}", Colors.RED)
+            self.save_log(action, "FAIL", str(e))
+            if is_script and os.path.exists(tmp_file):
+                os.remove(tmp_file)
 
     def print_progress(self, current, total, prefix=""):
         # Simple progress bar print
@@ -784,7 +2643,14 @@ class ZeroTwo:
         # Called by CLI subcommand --update
         self.check_for_updates(interactive=not self.headless)
 
+    def ask_resume(self, directory, journal_name):
+        if self.headless or not self.journal_pending(directory, journal_name):
+            return False
+        ans = input("    Unfinished previous run found. Resume it? (y/n): ").strip().lower()
+        return ans in ['y', 'yes', 's', 'si']
+
     def run_interactive(self):
+        self.start_background_update_check()
         while True:
             try:
                 self.clear()
@@ -799,7 +2665,7 @@ class ZeroTwo:
                 elif choice == '2':
                     d = input("    Directory to scan for .apks: ").strip()
                     if d:
-                        self.process_directory_apks(d)
+                        self.process_directory_apks(d, resume=self.ask_resume(d, ".zero_two_convert.journal"))
                 elif choice == '3':
                     apk = input("    Path to .apk to decompile: ").strip()
                     if apk:
@@ -821,7 +2687,7 @@ class ZeroTwo:
                 elif choice == '8':
                     d = input("    Directory to auto-scan: ").strip()
                     if d:
-                        self.auto_mode(d)
+                        self.auto_mode(d, resume=self.ask_resume(d, ".zero_two_auto.journal"))
                 elif choice == '9':
                     self.install_dependencies()
                 elif choice == '10':
@@ -851,12 +2717,49 @@ def main():
     parser.add_argument('--headless', action='store_true', help='Run in headless mode (no interactive prompts)')
     parser.add_argument('--convert', metavar='FILE', help='Convert a .apks bundle to .apk (single file)')
     parser.add_argument('--decompile', metavar='APK', help='Decompile a single APK file')
+    profiles = parser.add_mutually_exclusive_group()
+    profiles.add_argument('--only-dex', metavar='DEX', help='With --decompile: decode only this dex (e.g. classes3.dex); resources stay raw')
+    profiles.add_argument('--no-src', action='store_true', help='With --decompile: resources only, sources skipped')
+    profiles.add_argument('--no-res', action='store_true', help='With --decompile: sources only, resources kept raw')
+    profiles.add_argument('--manifest-only', action='store_true', help='With --decompile: decode only AndroidManifest.xml (not rebuildable)')
     parser.add_argument('--rebuild', metavar='DIR', help='Rebuild an APK from a decompiled directory')
     parser.add_argument('--sign', metavar='APK', help='Sign an APK using available tools')
     parser.add_argument('--info', metavar='APK', help='Show APK info (aapt/apktool)')
+    parser.add_argument('--verify', metavar='FILE', nargs='?', const=True,
+                        help='Verify .apks integrity (standalone with FILE, or as a pre-step for --convert)')
+    parser.add_argument('--batch', metavar='DIR', help='Convert every .apks bundle in a directory')
+    parser.add_argument('--auto', metavar='DIR', help='Auto mode: scan and process a directory')
+    parser.add_argument('--resume', action='store_true', help='Resume an interrupted --batch/--auto run from its journal')
+    parser.add_argument('--share', action='store_true', help='With --batch: split a shared (NFS) directory between nodes via lease files')
+    parser.add_argument('--node-id', metavar='ID', help='Node name for --share (default: hostname-pid)')
+    parser.add_argument('--lease-ttl', metavar='SEC', type=int, default=120, help='Seconds before a silent node\'s lease is reclaimed (default 120)')
+    parser.add_argument('--share-report', metavar='DIR', help='Show per-node throughput for a shared directory')
+    parser.add_argument('--inventory', metavar='DIR', help='Inventory every .apk/.apks under DIR (package, versions, SDKs, permissions, ABIs, dex count)')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv', help='Output format for --inventory (default csv)')
+    parser.add_argument('--output', metavar='FILE', help='Output file for --inventory')
+    parser.add_argument('--size-report', metavar='FILE', help='Size breakdown of an .apk/.apks from zip metadata (per split, path, dex, ABI)')
+    parser.add_argument('--top', metavar='N', type=int, default=15, help='Rows per section for --size-report (default 15)')
+    parser.add_argument('--json', action='store_true', help='JSON output for --size-report')
+    parser.add_argument('--index', metavar='DIR', help='Build/refresh the search index of a decompiled tree (incremental)')
+    parser.add_argument('--search', metavar='QUERY', help='With --index DIR: look up classes, methods, fields, strings, resource IDs (prefix; * for wildcard)')
+    parser.add_argument('--kind', choices=SmaliIndex.KINDS, help='Restrict --search to one symbol kind')
+    parser.add_argument('--limit', metavar='N', type=int, default=50, help='Max --search results (default 50)')
+    parser.add_argument('--keep-splits', action='store_true', help='With --convert/--batch: also keep every APK of the bundle in <name>_splits/')
+    parser.add_argument('--store', metavar='DIR', nargs='?', const=os.path.join(os.getcwd(), "cache", "split_store"),
+                        help='Deduplicate extracted APKs in a content-addressed store and hardlink outputs (default dir: cache/split_store)')
+    parser.add_argument('--store-gc', action='store_true', help='With --store: drop objects no output refers to anymore')
+    parser.add_argument('--scratch-dir', metavar='DIR', help='Root for temporary work dirs (default: tmpfs when it fits, else system temp; env ZERO_TWO_SCRATCH)')
+    parser.add_argument('--scratch-quota', metavar='MB', type=int, help='Max scratch space reserved by all zero_two runs sharing the scratch root; jobs wait for room')
+    parser.add_argument('--max-retries', metavar='N', type=int, default=3, help='Retry limit for failed items on --resume (default 3)')
     args = parser.parse_args()
+    profile_flags = [f for f, on in (('--only-dex', args.only_dex), ('--no-src', args.no_src),
+                                     ('--no-res', args.no_res), ('--manifest-only', args.manifest_only)) if on]
+    if profile_flags and not args.decompile:
+        parser.error(f"{', '.join(profile_flags)} requires --decompile APK")
 
-    app = ZeroTwo(headless=args.headless)
+    app = ZeroTwo(headless=args.headless, scratch_root=args.scratch_dir,
+                  scratch_quota=args.scratch_quota * 1024 * 1024 if args.scratch_quota is not None else None,
+                  store_root=args.store)
 
     # If a direct subcommand is used, run it and exit
     if args.update:
@@ -865,10 +2768,43 @@ def main():
     if args.convert:
         outdir = None
         # convert and exit
-        app.convert_apks_to_apk(args.convert, outdir)
+        app.convert_apks_to_apk(args.convert, outdir, verify=bool(args.verify), keep_splits=args.keep_splits)
+        return
+    if args.size_report:
+        app.size_report(args.size_report, top=args.top, as_json=args.json)
+        return
+    if args.inventory:
+        app.inventory_directory(args.inventory, output=args.output, fmt=args.format)
+        return
+    if args.index and args.search:
+        app.search_smali_index(args.index, args.search, kind=args.kind, limit=args.limit)
+        return
+    if args.index:
+        app.build_smali_index(args.index)
+        return
+    if args.search:
+        parser.error("--search requires --index DIR")
+    if args.store_gc:
+        app.store_gc()
+        return
+    if args.share_report:
+        app.show_share_report(args.share_report)
+        return
+    if args.batch and args.share:
+        app.process_directory_shared(args.batch, node_id=args.node_id, ttl=args.lease_ttl, max_retries=args.max_retries)
+        return
+    if args.batch:
+        app.process_directory_apks(args.batch, resume=args.resume, max_retries=args.max_retries, keep_splits=args.keep_splits)
+        return
+    if args.auto:
+        app.auto_mode(args.auto, resume=args.resume, max_retries=args.max_retries)
         return
+    if isinstance(args.verify, str):
+        ok = app.verify_apks(args.verify)
+        sys.exit(0 if ok else 1)
     if args.decompile:
-        app.decompile_apk(args.decompile)
+        profile = 'no-src' if args.no_src else 'no-res' if args.no_res else 'manifest' if args.manifest_only else 'full'
+        app.decompile_apk(args.decompile, profile=profile, only_dex=args.only_dex)
         return
     if args.rebuild:
         app.rebuild_apk(args.rebuild)